@@ -8,13 +8,102 @@ Architecture: Standalone V2 (no BaseAgent inheritance)
 Model: Gemini 2.5 Pro for complex frontend generation
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Sequence
+from collections import deque
+from itertools import groupby
+from operator import itemgetter
+import asyncio
 import json
-import base64
 import logging
 
 # Standalone - direct AI Router access
 from app.services.ai_router import ai_router, TaskComplexity
+from app.core.json_utils import json_dumps_compact
+
+
+# =============================================================================
+# CONFIG TEMPLATES
+# =============================================================================
+
+# Project-independent config files, written from templates instead of an
+# LLM call. Same stack the system prompt asks for: React 18, TypeScript,
+# React Router v6, Tailwind CSS, built with Vite.
+CONFIG_TEMPLATES: Dict[str, str] = {
+    "frontend/package.json": """{
+  "name": "frontend",
+  "private": true,
+  "version": "0.1.0",
+  "type": "module",
+  "scripts": {
+    "dev": "vite",
+    "build": "tsc && vite build",
+    "preview": "vite preview"
+  },
+  "dependencies": {
+    "react": "^18.3.1",
+    "react-dom": "^18.3.1",
+    "react-router-dom": "^6.26.2"
+  },
+  "devDependencies": {
+    "@types/react": "^18.3.5",
+    "@types/react-dom": "^18.3.0",
+    "@vitejs/plugin-react": "^4.3.1",
+    "autoprefixer": "^10.4.20",
+    "postcss": "^8.4.47",
+    "tailwindcss": "^3.4.13",
+    "typescript": "^5.6.2",
+    "vite": "^5.4.8"
+  }
+}
+""",
+    "frontend/tsconfig.json": """{
+  "compilerOptions": {
+    "target": "ES2020",
+    "useDefineForClassFields": true,
+    "lib": ["ES2020", "DOM", "DOM.Iterable"],
+    "module": "ESNext",
+    "skipLibCheck": true,
+    "moduleResolution": "bundler",
+    "allowImportingTsExtensions": true,
+    "resolveJsonModule": true,
+    "isolatedModules": true,
+    "noEmit": true,
+    "jsx": "react-jsx",
+    "strict": true,
+    "noUnusedLocals": true,
+    "noUnusedParameters": true,
+    "noFallthroughCasesInSwitch": true
+  },
+  "include": ["src"]
+}
+""",
+    "frontend/tailwind.config.js": """/** @type {import('tailwindcss').Config} */
+export default {
+  content: ["./index.html", "./src/**/*.{ts,tsx}"],
+  theme: {
+    extend: {},
+  },
+  plugins: [],
+};
+""",
+    "frontend/vite.config.ts": """import { defineConfig } from "vite";
+import react from "@vitejs/plugin-react";
+import tailwindcss from "tailwindcss";
+import autoprefixer from "autoprefixer";
+
+export default defineConfig({
+  plugins: [react()],
+  css: {
+    postcss: {
+      plugins: [tailwindcss(), autoprefixer()],
+    },
+  },
+});
+""",
+    "frontend/.env.example": """# Backend API base URL (read as import.meta.env.VITE_API_URL)
+VITE_API_URL=http://localhost:8000
+""",
+}
 
 
 class Aanya:
@@ -63,42 +152,34 @@ CODE QUALITY:
 4. Loading indicators
 5. Responsive design
 6. Accessibility (ARIA, alt text)
-7. Environment variables for API URL
+7. Environment variables for API URL (import.meta.env.VITE_API_URL)
 
-CRITICAL - OUTPUT FORMAT WITH BASE64:
-To avoid JSON encoding issues with newlines/quotes/special characters,
-encode the file content as base64.
+OUTPUT FORMAT:
+Return one JSON object with the complete file as a plain string:
 
 {
     "file_path": "frontend/src/components/MenuItem.tsx",
-    "file_content_base64": "BASE64_ENCODED_CONTENT_HERE",
+    "file_content": "import React from 'react';\\n...",
     "file_type": "typescript-react",
     "description": "Menu item component"
 }
 
-HOW TO ENCODE IN BASE64:
-1. Write your complete React/TypeScript code
-2. Convert to base64 string
-3. Return in JSON format above
+NEVER wrap the code in markdown blocks."""
 
-EXAMPLE:
-If you write this React code:
-```tsx
-import React from 'react';
+    # Structured output - the provider handles escaping of the code string
+    FILE_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "file_path": {"type": "string"},
+            "file_content": {"type": "string"},
+            "file_type": {"type": "string"},
+            "description": {"type": "string"},
+        },
+        "required": ["file_path", "file_content", "file_type", "description"],
+    }
 
-const Button = () => <button>Click</button>;
-export default Button;
-```
-
-You must encode it and return:
-{
-    "file_path": "frontend/src/components/Button.tsx",
-    "file_content_base64": "aW1wb3J0IFJlYWN0IGZyb20gJ3JlYWN0JzsKCmNvbnN0IEJ1dHRvbiA9ICgpID0+IDxidXR0b24+Q2xpY2s8L2J1dHRvbj47CmV4cG9ydCBkZWZhdWx0IEJ1dHRvbjs=",
-    "file_type": "typescript-react",
-    "description": "Simple button component"
-}
-
-NEVER return code in markdown blocks. ALWAYS base64 encode."""
+    # Max file generations in flight at once
+    MAX_PARALLEL_FILES = 8
 
     def __init__(self, project_id: str):
         """
@@ -120,6 +201,8 @@ NEVER return code in markdown blocks. ALWAYS base64 encode."""
         # Statistics
         self.files_generated = 0
         self.total_cost = 0.0
+        
+        self._file_slots = asyncio.Semaphore(self.MAX_PARALLEL_FILES)
     
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -134,7 +217,7 @@ NEVER return code in markdown blocks. ALWAYS base64 encode."""
         Returns:
             Dict containing:
                 - status: "success" or "error"
-                - files: List of generated files with base64 content
+                - files: List of generated files (path, content, type, description)
                 - total_files: Count of files
                 - cost: Total generation cost
         """
@@ -151,23 +234,31 @@ NEVER return code in markdown blocks. ALWAYS base64 encode."""
             # Generate file list
             file_plan = await self._plan_files(fe_arch, api_arch)
             
-            # Generate each file
+            # Serialized once - every file prompt embeds the same architecture
+            fe_arch_json = json_dumps_compact(fe_arch)
+            api_arch_json = json_dumps_compact(api_arch)
+            
+            # Generate band by band (core → API → pages → components → config).
+            # Files in a band are independent, so they run concurrently.
             generated_files = []
-            context = []
+            recent_paths = deque(maxlen=3)  # Only the last 3 go into prompts
             
-            for file_spec in file_plan["files"]:
-                self.logger.info(f"📝 Generating {file_spec['path']}...")
-                
-                file_result = await self._generate_frontend_file(
-                    file_spec,
-                    fe_arch,
-                    api_arch,
-                    context
-                )
+            # Generations by spec key, reused for duplicate specs in this plan
+            # only - a later run may have a different architecture
+            generations: Dict[tuple, asyncio.Future] = {}
+            
+            for _, band in groupby(file_plan["files"], key=itemgetter("priority")):
+                band_context = tuple(recent_paths)  # Same snapshot for the whole band
+                band_results = await asyncio.gather(*(
+                    self._generate_frontend_file(
+                        file_spec, fe_arch_json, api_arch_json, band_context, generations
+                    )
+                    for file_spec in band
+                ))
                 
-                generated_files.append(file_result)
-                context.append(file_result)
-                self.files_generated += 1
+                generated_files.extend(band_results)
+                recent_paths.extend(result["file_path"] for result in band_results)
+                self.files_generated += len(band_results)
             
             self.logger.info(
                 f"✅ Frontend generation complete: {len(generated_files)} files, "
@@ -193,7 +284,9 @@ NEVER return code in markdown blocks. ALWAYS base64 encode."""
         """
         Plan which frontend files to generate.
         
-        Returns ordered list of files with priorities.
+        Returns ordered list of files with priorities. Sections are appended
+        in ascending priority, so the list comes out sorted without a sort
+        pass (execute() generates it band by band in this order).
         """
         files = [
             # Core
@@ -245,24 +338,64 @@ NEVER return code in markdown blocks. ALWAYS base64 encode."""
             {"path": "frontend/README.md", "type": "markdown", "priority": 7, "purpose": "Documentation"}
         ])
         
-        files.sort(key=lambda x: x["priority"])
-        
         return {"files": files}
     
     async def _generate_frontend_file(
         self,
         file_spec: Dict[str, Any],
-        fe_arch: Dict[str, Any],
-        api_arch: Dict[str, Any],
-        context: List[Dict[str, Any]]
+        fe_arch_json: str,
+        api_arch_json: str,
+        recent_paths: Sequence[str],
+        generations: Dict[tuple, asyncio.Future]
+    ) -> Dict[str, Any]:
+        """Generate a single frontend file (architectures passed pre-serialized)"""
+        
+        # Static config files come from templates - no LLM call
+        template = CONFIG_TEMPLATES.get(file_spec["path"])
+        if template is not None:
+            return {
+                "file_path": file_spec["path"],
+                "file_content": template,
+                "file_type": file_spec["type"],
+                "description": file_spec["purpose"]
+            }
+        
+        # The same component can be planned more than once (e.g. listed twice
+        # in a category). Reuse the first generation instead of paying again,
+        # even if it is still in flight.
+        spec_key = self._spec_key(file_spec)
+        generation = generations.get(spec_key)
+        if generation is not None:
+            self.logger.info(f"♻️  Reusing generated {file_spec['path']}")
+            return dict(await generation)
+        
+        generation = asyncio.ensure_future(
+            self._request_frontend_file(file_spec, fe_arch_json, api_arch_json, recent_paths)
+        )
+        generations[spec_key] = generation
+        
+        # A failed or cancelled generation must not be handed out again
+        def forget_failed(task: asyncio.Future):
+            if task.cancelled() or task.exception() is not None:
+                generations.pop(spec_key, None)
+        
+        generation.add_done_callback(forget_failed)
+        return await generation
+    
+    async def _request_frontend_file(
+        self,
+        file_spec: Dict[str, Any],
+        fe_arch_json: str,
+        api_arch_json: str,
+        recent_paths: Sequence[str]
     ) -> Dict[str, Any]:
-        """Generate a single frontend file"""
+        """Ask the model for one file as structured JSON"""
         
         context_str = ""
-        if context:
-            context_str = "\n\nPREVIOUSLY GENERATED:\n"
-            for prev in context[-3:]:
-                context_str += f"- {prev['path']}\n"
+        if recent_paths:
+            context_str = "\n\nPREVIOUSLY GENERATED:\n" + "".join(
+                f"- {path}\n" for path in recent_paths
+            )
         
         generation_prompt = f"""
 Generate frontend code for:
@@ -271,34 +404,29 @@ FILE: {file_spec['path']}
 PURPOSE: {file_spec['purpose']}
 
 FRONTEND ARCHITECTURE:
-{json.dumps(fe_arch, indent=2)}
+{fe_arch_json}
 
 API ARCHITECTURE:
-{json.dumps(api_arch, indent=2)}
+{api_arch_json}
 {context_str}
 
 Generate COMPLETE, PRODUCTION-READY React/TypeScript code.
 Include imports, types, error handling, accessibility.
 
-CRITICAL: Return file content as BASE64 to avoid JSON issues.
-
-Return ONLY valid JSON in this format:
-{{
-    "file_path": "{file_spec['path']}",
-    "file_content_base64": "YOUR_BASE64_ENCODED_CODE_HERE",
-    "file_type": "{file_spec['type']}",
-    "description": "Brief description"
-}}
+Return file_path "{file_spec['path']}" and file_type "{file_spec['type']}".
 """
         
-        # Call AI Router directly
-        response = await self.ai_router.generate(
-            messages=[{"role": "user", "content": generation_prompt}],
-            system_prompt=self.SYSTEM_PROMPT,
-            task_type="code_generation",
-            complexity=TaskComplexity.COMPLEX,
-            max_tokens=8000
-        )
+        # Call AI Router directly (at most MAX_PARALLEL_FILES at a time)
+        async with self._file_slots:
+            self.logger.info(f"📝 Generating {file_spec['path']}...")
+            response = await self.ai_router.generate(
+                messages=[{"role": "user", "content": generation_prompt}],
+                system_prompt=self.SYSTEM_PROMPT,
+                task_type="code_generation",
+                complexity=TaskComplexity.COMPLEX,
+                max_tokens=8000,
+                response_schema=self.FILE_SCHEMA
+            )
         
         # Log cost
         self.total_cost += response.cost_estimate
@@ -309,20 +437,22 @@ Return ONLY valid JSON in this format:
         
         # Parse response
         try:
-            result = json.loads(response.content)
-            
-            # Decode base64 content
-            if "file_content_base64" in result:
-                decoded = base64.b64decode(result["file_content_base64"]).decode("utf-8")
-                result["file_content"] = decoded
-            
-            return result
+            return json.loads(response.content)
             
         except json.JSONDecodeError as e:
             self.logger.error(f"❌ Failed to parse JSON: {e}")
             self.logger.error(f"Response: {response.content[:500]}")
             raise
     
+    @staticmethod
+    def _spec_key(file_spec: Dict[str, Any]) -> tuple:
+        """Full path, type and normalized purpose - what the generated code depends on"""
+        return (
+            file_spec["path"],
+            file_spec["type"],
+            " ".join(file_spec["purpose"].casefold().split())
+        )
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get generation statistics"""
         return {
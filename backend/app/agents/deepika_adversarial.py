@@ -21,12 +21,14 @@ Model: Claude Sonnet 4.5 (always)
 """
 
 from typing import Dict, Any, List
+from collections import Counter
 import json
-import re
 import logging
 
 # Adjust imports based on your project structure
 from app.services.ai_router import ai_router, TaskComplexity
+from app.core.json_utils import json_loads, FENCED_JSON_RE, JSON_OBJECT_RE
+
 
 
 class DeepikaAdversarial:
@@ -76,22 +78,51 @@ class DeepikaAdversarial:
         Returns:
             Dict containing performance issues found
         """
+        request = self.encode_request(code, file_type)
+        
         try:
-            self.total_reviews += 1
-            self.logger.info(f"⚡ Starting performance review #{self.total_reviews} for {file_type} code")
-            
-            # Build adversarial prompt
-            prompt = self._build_adversarial_prompt(code, file_type)
-            
-            # Call AI Router
-            # Uncomment when integrating
-            response = await self.ai_router.generate(
-                 messages=[{"role": "user", "content": prompt}],
-                 task_type="adversarial_performance",
-                 complexity=TaskComplexity.COMPLEX
-            )
-            
+            response = await self.ai_router.generate(**request)
+        except Exception as e:
+            self.logger.error(f"❌ Performance review failed: {e}")
+            raise
+        
+        return self.decode_response(response)
+    
+    def encode_request(self, code: str, file_type: str = "python") -> Dict[str, Any]:
+        """
+        Build the AI Router request for a review without sending it.
+        
+        Args:
+            code: Source code to review
+            file_type: Type of code (python, javascript, typescript, etc.)
+        
+        Returns:
+            Keyword arguments for ai_router.generate()
+        """
+        self.total_reviews += 1
+        self.logger.info(f"⚡ Starting performance review #{self.total_reviews} for {file_type} code")
+        
+        # Build adversarial prompt
+        prompt = self._build_adversarial_prompt(code, file_type)
         
+        # Call AI Router
+        return {
+            "messages": [{"role": "user", "content": prompt}],
+            "task_type": "adversarial_performance",
+            "complexity": TaskComplexity.COMPLEX
+        }
+    
+    def decode_response(self, response) -> Dict[str, Any]:
+        """
+        Turn an AI Router response into the review result.
+        
+        Args:
+            response: AIResponse for a request built by encode_request()
+        
+        Returns:
+            Same dict as review()
+        """
+        try:
             # Log cost
             self.logger.info(
                 f"✅ {response.output_tokens} tokens, "
@@ -105,13 +136,10 @@ class DeepikaAdversarial:
             issues_found = result.get("issues_found", 0)
             self.total_issues_found += issues_found
             
-            # Count high and critical impact
-            for detail in result.get("details", []):
-                severity = detail.get("severity", "")
-                if severity == "CRITICAL":
-                    self.critical_impact_count += 1
-                elif severity == "HIGH":
-                    self.high_impact_count += 1
+            # Count high and critical impact (one counting pass)
+            severities = Counter(detail.get("severity") for detail in result.get("details", []))
+            self.critical_impact_count += severities["CRITICAL"]
+            self.high_impact_count += severities["HIGH"]
             
             self.logger.info(
                 f"🎯 DEEPIKA found {issues_found} performance issues "
@@ -267,18 +295,19 @@ IMPORTANT: Return ONLY valid JSON. No markdown formatting. No backticks."""
     def _parse_response(self, content: str) -> Dict[str, Any]:
         """Parse AI response into structured format."""
         try:
-            return json.loads(content)
+            return json_loads(content)
+            
         except json.JSONDecodeError:
-            # Try extracting JSON from markdown
-            json_match = re.search(r'```json\n(.*?)\n```', content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-            json_match = re.search(r'```\n(.*?)\n```', content, re.DOTALL)
+            # Try extracting JSON from a markdown code block
+            json_match = FENCED_JSON_RE.search(content)
             if json_match:
-                return json.loads(json_match.group(1))
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
+                return json_loads(json_match.group(1))
+            
+            # Last resort: try to find JSON object in text
+            json_match = JSON_OBJECT_RE.search(content)
             if json_match:
-                return json.loads(json_match.group(0))
+                return json_loads(json_match.group(0))
+            
             raise ValueError(f"Could not parse response: {content[:200]}")
     
     def _error_response(self, error_message: str) -> Dict[str, Any]:
@@ -21,12 +21,14 @@ Model: Claude Sonnet 4.5 (always)
 """
 
 from typing import Dict, Any, List
+from collections import Counter
 import json
-import re
 import logging
 
 # Adjust imports based on your project structure
 from app.services.ai_router import ai_router, TaskComplexity
+from app.core.json_utils import json_loads, FENCED_JSON_RE, JSON_OBJECT_RE
+
 
 
 class KaranAdversarial:
@@ -90,21 +92,51 @@ class KaranAdversarial:
                 "details": [...]
             }
         """
+        request = self.encode_request(code, file_type)
+        
+        try:
+            response = await self.ai_router.generate(**request)
+        except Exception as e:
+            self.logger.error(f"❌ Security review failed: {e}")
+            raise
+        
+        return self.decode_response(response)
+    
+    def encode_request(self, code: str, file_type: str = "python") -> Dict[str, Any]:
+        """
+        Build the AI Router request for a review without sending it.
+        
+        Args:
+            code: Source code to review
+            file_type: Type of code (python, javascript, typescript, etc.)
+        
+        Returns:
+            Keyword arguments for ai_router.generate()
+        """
+        self.total_reviews += 1
+        self.logger.info(f"🔒 Starting security review #{self.total_reviews} for {file_type} code")
+        
+        # Build adversarial prompt
+        prompt = self._build_adversarial_prompt(code, file_type)
+        
+        # Call AI Router
+        return {
+            "messages": [{"role": "user", "content": prompt}],
+            "task_type": "adversarial_security",
+            "complexity": TaskComplexity.COMPLEX
+        }
+    
+    def decode_response(self, response) -> Dict[str, Any]:
+        """
+        Turn an AI Router response into the review result.
+        
+        Args:
+            response: AIResponse for a request built by encode_request()
+        
+        Returns:
+            Same dict as review()
+        """
         try:
-            self.total_reviews += 1
-            self.logger.info(f"🔒 Starting security review #{self.total_reviews} for {file_type} code")
-            
-            # Build adversarial prompt
-            prompt = self._build_adversarial_prompt(code, file_type)
-            
-            # Call AI Router
-            # Uncomment when integrating
-            response = await self.ai_router.generate(
-                messages=[{"role": "user", "content": prompt}],
-                task_type="adversarial_security",
-                complexity=TaskComplexity.COMPLEX
-            )
-            
             # Log cost
             self.logger.info(
                 f"✅ {response.output_tokens} tokens, "
@@ -118,12 +150,10 @@ class KaranAdversarial:
             vulns_found = result.get("vulnerabilities_found", 0)
             self.total_vulnerabilities_found += vulns_found
             
-            # Count critical and high severity
-            for detail in result.get("details", []):
-                if detail.get("severity") == "CRITICAL":
-                    self.critical_count += 1
-                elif detail.get("severity") == "HIGH":
-                    self.high_count += 1
+            # Count critical and high severity (one counting pass)
+            severities = Counter(detail.get("severity") for detail in result.get("details", []))
+            self.critical_count += severities["CRITICAL"]
+            self.high_count += severities["HIGH"]
             
             self.logger.info(
                 f"🎯 KARAN found {vulns_found} vulnerabilities "
@@ -297,23 +327,18 @@ IMPORTANT: Return ONLY valid JSON. No markdown formatting. No backticks."""
         """
         try:
             # Try direct JSON parse first
-            return json.loads(content)
+            return json_loads(content)
             
         except json.JSONDecodeError:
-            # Try extracting JSON from markdown code blocks
-            json_match = re.search(r'```json\n(.*?)\n```', content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-            
-            # Try without json marker
-            json_match = re.search(r'```\n(.*?)\n```', content, re.DOTALL)
+            # Try extracting JSON from a markdown code block
+            json_match = FENCED_JSON_RE.search(content)
             if json_match:
-                return json.loads(json_match.group(1))
+                return json_loads(json_match.group(1))
             
             # Last resort: try to find JSON object in text
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
+            json_match = JSON_OBJECT_RE.search(content)
             if json_match:
-                return json.loads(json_match.group(0))
+                return json_loads(json_match.group(0))
             
             raise ValueError(f"Could not parse response as JSON: {content[:200]}")
     
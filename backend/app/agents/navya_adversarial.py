@@ -17,13 +17,22 @@ Specializations:
 Model: Claude Sonnet 4.5 (always)
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+import copy
+import hashlib
 import json
-import re
 import logging
 
 # AI Router integration
 from app.services.ai_router import ai_router, TaskComplexity
+from app.core.json_utils import json_loads, FENCED_JSON_RE, JSON_OBJECT_RE
+
+
+# Reviews of code already seen, keyed by content hash - LRU, shared by every
+# instance (projects often resubmit unchanged files)
+REVIEW_CACHE_SIZE = 1000
+_review_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 
 
 class NavyaAdversarial:
@@ -85,20 +94,94 @@ class NavyaAdversarial:
                 "details": [...]
             }
         """
+        request = self.encode_request(code, file_type)
+        
+        cached = self.cached_review(request)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self.ai_router.generate(**request)
+        except Exception as e:
+            self.logger.error(f"❌ Review failed: {e}")
+            raise
+        
+        result = self.decode_response(response)
+        self.store_review(request, result)
+        
+        return result
+    
+    def cached_review(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Return the earlier review of an identical request, if any.
+        
+        Identical code on the same model gets the same review. Used by
+        review() and by batch/parallel callers before sending a request
+        built by encode_request().
+        """
+        key = self._review_key(request)
+        cached = _review_cache.get(key)
+        if cached is None:
+            return None
+        
+        _review_cache.move_to_end(key)
+        self.total_bugs_found += cached.get("bugs_found", 0)
+        self.logger.info(f"♻️  Reusing review of identical code (key: {key[:8]})")
+        return copy.deepcopy(cached)
+    
+    def store_review(self, request: Dict[str, Any], result: Dict[str, Any]):
+        """Remember a successful review of a request built by encode_request()"""
+        if "error" in result:
+            return
+        
+        _review_cache[self._review_key(request)] = copy.deepcopy(result)
+        if len(_review_cache) > REVIEW_CACHE_SIZE:
+            _review_cache.popitem(last=False)
+    
+    def _review_key(self, request: Dict[str, Any]) -> str:
+        """SHA-256 of everything that shapes the review (model, prompt with language + code)"""
+        model = self.ai_router.select_model(request["task_type"], request["complexity"])
+        prompt = request["messages"][-1]["content"]
+        return hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+    
+    def encode_request(self, code: str, file_type: str = "python") -> Dict[str, Any]:
+        """
+        Build the AI Router request for a review without sending it.
+        
+        Used directly by review() and by batch mode, where several
+        reviewers' requests are submitted together.
+        
+        Args:
+            code: Source code to review
+            file_type: Type of code (python, javascript, typescript, etc.)
+        
+        Returns:
+            Keyword arguments for ai_router.generate()
+        """
+        self.total_reviews += 1
+        self.logger.info(f"🔍 Starting review #{self.total_reviews} for {file_type} code")
+        
+        # Build adversarial prompt
+        prompt = self._build_adversarial_prompt(code, file_type)
+        
+        # Call AI Router with adversarial_logic task type
+        return {
+            "messages": [{"role": "user", "content": prompt}],
+            "task_type": "adversarial_logic",
+            "complexity": TaskComplexity.COMPLEX
+        }
+    
+    def decode_response(self, response) -> Dict[str, Any]:
+        """
+        Turn an AI Router response into the review result.
+        
+        Args:
+            response: AIResponse for a request built by encode_request()
+        
+        Returns:
+            Same dict as review()
+        """
         try:
-            self.total_reviews += 1
-            self.logger.info(f"🔍 Starting review #{self.total_reviews} for {file_type} code")
-            
-            # Build adversarial prompt
-            prompt = self._build_adversarial_prompt(code, file_type)
-            
-            # Call AI Router with adversarial_logic task type
-            response = await self.ai_router.generate(
-                messages=[{"role": "user", "content": prompt}],
-                task_type="adversarial_logic",
-                complexity=TaskComplexity.COMPLEX
-            )
-            
             # Log cost
             self.logger.info(
                 f"✅ {response.output_tokens} tokens, "
@@ -242,23 +325,18 @@ IMPORTANT: Return ONLY valid JSON. No markdown formatting. No backticks."""
         """
         try:
             # Try direct JSON parse first
-            return json.loads(content)
+            return json_loads(content)
             
         except json.JSONDecodeError:
-            # Try extracting JSON from markdown code blocks
-            json_match = re.search(r'```json\n(.*?)\n```', content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-            
-            # Try without json marker
-            json_match = re.search(r'```\n(.*?)\n```', content, re.DOTALL)
+            # Try extracting JSON from a markdown code block
+            json_match = FENCED_JSON_RE.search(content)
             if json_match:
-                return json.loads(json_match.group(1))
+                return json_loads(json_match.group(1))
             
             # Last resort: try to find JSON object in text
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
+            json_match = JSON_OBJECT_RE.search(content)
             if json_match:
-                return json.loads(json_match.group(0))
+                return json_loads(json_match.group(0))
             
             raise ValueError(f"Could not parse response as JSON: {content[:200]}")
     
@@ -0,0 +1,131 @@
+# =============================================================================
+# TILOTMA POOL - One live orchestrator per active conversation
+# Location: backend/app/agents/pool.py
+# Purpose: Reuse Tilotma instances across chat requests
+# =============================================================================
+#
+# Building a Tilotma per HTTP request throws away the conversation context
+# (phase, rolling history, readiness state) after every message. The pool
+# keeps instances keyed by (project_id, user_id):
+# - LRU eviction once MAX_AGENTS are live
+# - Instances idle for longer than AGENT_TTL_SECONDS are rebuilt
+# - Evicted agents finish their pending message writes before being dropped
+# - evict() drops an agent whose history was cleared or whose project was
+#   deleted, so it can't keep answering from the old context
+# - Each agent has a lock: use_tilotma() serializes concurrent requests for
+#   the same conversation (the agent's history is mutable, shared state)
+#
+# =============================================================================
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Set, Tuple
+
+from app.agents.tilotma import Tilotma
+
+logger = logging.getLogger(__name__)
+
+MAX_AGENTS = 1024
+AGENT_TTL_SECONDS = 15 * 60
+
+# (project_id, user_id) -> (agent, its lock, time.monotonic() of last use), oldest first
+_pool: "OrderedDict[Tuple[Optional[str], str], Tuple[Tilotma, asyncio.Lock, float]]" = OrderedDict()
+
+# Flushes of evicted agents (kept referenced until they finish)
+_flushes: Set[asyncio.Task] = set()
+
+
+def get_tilotma(project_id: Optional[str], user_id: str) -> Tilotma:
+    """
+    Get the live Tilotma for a conversation, creating it if needed.
+
+    Must be called from async code (evictions schedule a flush).
+
+    Args:
+        project_id: UUID of the project (None for pre-project chat)
+        user_id: UUID of the user
+
+    Returns:
+        Tilotma instance for this conversation
+    """
+
+    return _checkout(project_id, user_id)[0]
+
+
+@asynccontextmanager
+async def use_tilotma(project_id: Optional[str], user_id: str) -> AsyncIterator[Tilotma]:
+    """
+    Get the live Tilotma for a conversation and hold it exclusively.
+
+    Concurrent requests for the same conversation wait for each other, so
+    two messages never interleave in the agent's history.
+
+    Usage:
+        async with use_tilotma(project_id, user_id) as tilotma:
+            result = await tilotma.execute({"message": content})
+    """
+
+    agent, lock = _checkout(project_id, user_id)
+    async with lock:
+        yield agent
+
+
+async def evict(project_id: Optional[str], user_id: str):
+    """
+    Drop the live Tilotma for a conversation, if there is one.
+
+    Call when its history was cleared or edited, or its project deleted.
+    Waits for the agent's pending message writes, so callers deleting
+    messages afterwards don't race them.
+
+    Args:
+        project_id: UUID of the project (None for pre-project chat)
+        user_id: UUID of the user
+    """
+
+    entry = _pool.pop(_key(project_id, user_id), None)
+    if entry is not None:
+        flush = _retire(entry[0])
+        if flush is not None:
+            await flush
+
+
+def _key(project_id: Optional[str], user_id: str) -> Tuple[Optional[str], str]:
+    return (str(project_id) if project_id else None, str(user_id))
+
+
+def _checkout(project_id: Optional[str], user_id: str) -> Tuple[Tilotma, asyncio.Lock]:
+    """Pooled (agent, lock) for a conversation - created, refreshed and LRU-ordered here"""
+
+    key = _key(project_id, user_id)
+    now = time.monotonic()
+
+    entry = _pool.pop(key, None)
+    if entry is not None and now - entry[2] <= AGENT_TTL_SECONDS:
+        agent, lock = entry[0], entry[1]
+    else:
+        if entry is not None:
+            _retire(entry[0])  # Idle too long - start from a fresh context
+        agent, lock = Tilotma(project_id=key[0], user_id=key[1]), asyncio.Lock()
+
+    _pool[key] = (agent, lock, now)  # Most recently used goes last
+
+    while len(_pool) > MAX_AGENTS:
+        _, (evicted, _, _) = _pool.popitem(last=False)
+        _retire(evicted)
+
+    return agent, lock
+
+
+def _retire(agent: Tilotma) -> Optional[asyncio.Task]:
+    """Let a dropped agent finish persisting its messages (returns the flush, if any)"""
+    task = None
+    if agent.context.pending_writes:
+        task = asyncio.get_running_loop().create_task(agent.context.flush())
+        _flushes.add(task)
+        task.add_done_callback(_flushes.discard)
+    logger.info(f"♻️  Retired Tilotma for project {agent.project_id}")
+    return task
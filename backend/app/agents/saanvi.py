@@ -25,7 +25,7 @@
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
@@ -180,6 +180,35 @@ class RequirementsSpec:
         }
 
 
+# =============================================================================
+# SCORING TABLES
+# =============================================================================
+
+# Base complexity score by project type
+PROJECT_TYPE_SCORES = {
+    ProjectType.LANDING_PAGE: 1,
+    ProjectType.BUSINESS_WEBSITE: 3,
+    ProjectType.WEB_APP: 5,
+    ProjectType.ECOMMERCE: 6,
+    ProjectType.MOBILE_APP: 7,
+    ProjectType.API_SERVICE: 5,
+    ProjectType.SAAS: 9,
+    ProjectType.CUSTOM: 5
+}
+
+# Base price (INR) by complexity
+BASE_PRICES = {
+    1: 10000, 2: 15000, 3: 30000, 4: 40000, 5: 60000,
+    6: 80000, 7: 120000, 8: 160000, 9: 250000, 10: 300000
+}
+
+# Base days by complexity
+BASE_DAYS = {
+    1: 2, 2: 3, 3: 5, 4: 7, 5: 10,
+    6: 14, 7: 21, 8: 28, 9: 35, 10: 42
+}
+
+
 # =============================================================================
 # SAANVI AGENT CLASS
 # =============================================================================
@@ -260,22 +289,14 @@ class Saanvi:
         self.logger.info("🎯 Detecting project type...")
         project_type = self._detect_project_type(requirements)
         
-        # Step 4: Calculate complexity
-        self.logger.info("📊 Calculating complexity...")
-        complexity = self._calculate_complexity(requirements, project_type)
+        # Steps 4, 6, 7: Complexity, pricing and timeline in one pass
+        self.logger.info("📊 Calculating complexity, pricing and timeline...")
+        complexity, pricing, timeline = self._score_all(requirements, project_type)
         
         # Step 5: Recommend tech stack
         self.logger.info("⚙️ Recommending technology stack...")
         tech_stack = self._recommend_tech_stack(project_type, complexity)
         
-        # Step 6: Calculate pricing
-        self.logger.info("💰 Calculating pricing...")
-        pricing = self._calculate_pricing(complexity, requirements)
-        
-        # Step 7: Estimate timeline
-        self.logger.info("📅 Estimating timeline...")
-        timeline = self._estimate_timeline(complexity, project_type)
-        
         # Step 8: Generate specification
         spec = RequirementsSpec(
             project_id=self.project_id,
@@ -446,6 +467,8 @@ JSON format:
         - Project type
         - Technical requirements
         
+        Kept for callers that only need the score (no pricing or timeline).
+        
         Args:
             requirements: Extracted requirements
             project_type: Type of project
@@ -453,42 +476,7 @@ JSON format:
         Returns:
             Complexity score 1-10
         """
-        
-        score = 0
-        
-        # Base score by project type
-        type_scores = {
-            ProjectType.LANDING_PAGE: 1,
-            ProjectType.BUSINESS_WEBSITE: 3,
-            ProjectType.WEB_APP: 5,
-            ProjectType.ECOMMERCE: 6,
-            ProjectType.MOBILE_APP: 7,
-            ProjectType.API_SERVICE: 5,
-            ProjectType.SAAS: 9,
-            ProjectType.CUSTOM: 5
-        }
-        score += type_scores.get(project_type, 5)
-        
-        # Feature count
-        feature_count = len(requirements["functional"])
-        if feature_count <= 3:
-            score += 0
-        elif feature_count <= 7:
-            score += 1
-        elif feature_count <= 12:
-            score += 2
-        else:
-            score += 3
-        
-        # Technical requirements
-        non_func = " ".join(requirements["non_functional"]).lower()
-        if "auth" in non_func or "payment" in non_func:
-            score += 1
-        if "real-time" in non_func or "websocket" in non_func:
-            score += 1
-        
-        # Cap at 10
-        return min(10, max(1, score))
+        return self._score_complexity(project_type, *self._requirement_flags(requirements))
     
     def _recommend_tech_stack(
         self,
@@ -548,6 +536,79 @@ JSON format:
     # PRICING & TIMELINE
     # =========================================================================
     
+    def _score_all(
+        self,
+        requirements: Dict[str, Any],
+        project_type: ProjectType
+    ) -> Tuple[int, PricingBreakdown, Timeline]:
+        """
+        Calculate complexity, pricing and timeline in a single pass.
+        
+        The feature count and the non-functional keyword flags are derived
+        once from the requirements and shared by all three scoring stages,
+        instead of each stage re-joining and re-scanning the same lists.
+        
+        Args:
+            requirements: Extracted requirements
+            project_type: Type of project
+        
+        Returns:
+            (complexity, pricing, timeline)
+        """
+        
+        feature_count, has_auth, has_payment, has_realtime = self._requirement_flags(requirements)
+        complexity = self._score_complexity(
+            project_type, feature_count, has_auth, has_payment, has_realtime
+        )
+        
+        pricing = self._build_pricing(complexity, feature_count, has_auth, has_payment)
+        timeline = self._build_timeline(complexity)
+        
+        return complexity, pricing, timeline
+    
+    @staticmethod
+    def _requirement_flags(requirements: Dict[str, Any]) -> Tuple[int, bool, bool, bool]:
+        """Feature count and auth / payment / real-time flags (one scan of the requirements)"""
+        non_func = " ".join(requirements["non_functional"]).lower()
+        return (
+            len(requirements["functional"]),
+            "auth" in non_func,
+            "payment" in non_func,
+            "real-time" in non_func or "websocket" in non_func
+        )
+    
+    @staticmethod
+    def _score_complexity(
+        project_type: ProjectType,
+        feature_count: int,
+        has_auth: bool,
+        has_payment: bool,
+        has_realtime: bool
+    ) -> int:
+        """Complexity score 1-10 from the project type and requirement flags"""
+        
+        # Base score by project type
+        score = PROJECT_TYPE_SCORES.get(project_type, 5)
+        
+        # Feature count
+        if feature_count <= 3:
+            score += 0
+        elif feature_count <= 7:
+            score += 1
+        elif feature_count <= 12:
+            score += 2
+        else:
+            score += 3
+        
+        # Technical requirements
+        if has_auth or has_payment:
+            score += 1
+        if has_realtime:
+            score += 1
+        
+        # Cap at 10
+        return min(10, max(1, score))
+    
     def _calculate_pricing(
         self,
         complexity: int,
@@ -571,24 +632,28 @@ JSON format:
             PricingBreakdown
         """
         
-        # Base pricing table
-        base_prices = {
-            1: 10000, 2: 15000, 3: 30000, 4: 40000, 5: 60000,
-            6: 80000, 7: 120000, 8: 160000, 9: 250000, 10: 300000
-        }
+        feature_count, has_auth, has_payment, _ = self._requirement_flags(requirements)
+        return self._build_pricing(complexity, feature_count, has_auth, has_payment)
+    
+    def _build_pricing(
+        self,
+        complexity: int,
+        feature_count: int,
+        has_auth: bool,
+        has_payment: bool
+    ) -> PricingBreakdown:
+        """Build PricingBreakdown from precomputed requirement facts"""
         
-        base_price = base_prices.get(complexity, 50000)
+        base_price = BASE_PRICES.get(complexity, 50000)
         
         # Feature cost (₹5k per feature above 5)
-        feature_count = len(requirements["functional"])
         features_cost = max(0, (feature_count - 5) * 5000)
         
         # Tech complexity (if auth/payment)
-        non_func = " ".join(requirements["non_functional"]).lower()
         tech_cost = 0
-        if "auth" in non_func:
+        if has_auth:
             tech_cost += 10000
-        if "payment" in non_func:
+        if has_payment:
             tech_cost += 15000
         
         total = base_price + features_cost + tech_cost
@@ -617,14 +682,12 @@ JSON format:
         Returns:
             Timeline
         """
+        return self._build_timeline(complexity)
+    
+    def _build_timeline(self, complexity: int) -> Timeline:
+        """Build Timeline from complexity score"""
         
-        # Base days by complexity
-        base_days = {
-            1: 2, 2: 3, 3: 5, 4: 7, 5: 10,
-            6: 14, 7: 21, 8: 28, 9: 35, 10: 42
-        }
-        
-        total_days = base_days.get(complexity, 14)
+        total_days = BASE_DAYS.get(complexity, 14)
         
         # Phase breakdown
         phases = {
@@ -719,7 +782,8 @@ JSON format:
             Markdown string
         """
         
-        md = f"""# {spec.project_name}
+        # Sections are collected and joined once (no repeated string copies)
+        md = [f"""# {spec.project_name}
 **Project ID:** {spec.project_id}  
 **Type:** {spec.project_type.value}  
 **Created:** {spec.created_at.strftime("%Y-%m-%d %H:%M")}  
@@ -729,22 +793,21 @@ JSON format:
 
 ## Functional Requirements
 
-"""
+"""]
         
         for i, feature in enumerate(spec.functional_requirements, 1):
             critical = "🔴 Critical" if feature.is_critical else "🟡 Optional"
-            md += f"{i}. **{feature.name}** ({critical})  \n"
-            md += f"   {feature.description}\n\n"
+            md.append(f"{i}. **{feature.name}** ({critical})  \n")
+            md.append(f"   {feature.description}\n\n")
         
-        md += f"""---
+        md.append("""---
 
 ## Non-Functional Requirements
 
-"""
-        for req in spec.non_functional_requirements:
-            md += f"- {req}\n"
+""")
+        md.extend(f"- {req}\n" for req in spec.non_functional_requirements)
         
-        md += f"""
+        md.append(f"""
 ---
 
 ## Technology Stack
@@ -774,12 +837,11 @@ JSON format:
 **Completion Date:** {spec.timeline.estimated_completion}
 
 ### Phase Breakdown:
-"""
+""")
         
-        for phase, days in spec.timeline.phases.items():
-            md += f"- {phase}: {days} days\n"
+        md.extend(f"- {phase}: {days} days\n" for phase, days in spec.timeline.phases.items())
         
-        return md
+        return "".join(md)
 
 
 # =============================================================================
@@ -611,7 +611,7 @@ SECURITY SPECIFIC REQUIREMENTS:
             return True
         
         # Check if ends mid-line
-        last_line = code.split('\n')[-1].strip()
+        last_line = code.rpartition('\n')[2].strip()
         incomplete_patterns = [
             'def ', 'class ', 'async def ',
             'return ', 'yield ',
@@ -25,12 +25,16 @@
 import os
 import re
 import json
+import math
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator, Callable, Awaitable, Set
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
 import uuid
+from collections import Counter, OrderedDict, deque
+from functools import cached_property
 
 # Import AI Router V2
 try:
@@ -44,11 +48,212 @@ except ImportError:
         MEDIUM = "medium"
         COMPLEX = "complex"
 
+# Pools latency-tolerant calls (batched reviews, quality gate) into half-price batches
+from app.services.fleet import fleet
+from app.core.json_utils import json_loads
+
+# Adversarial reviewers (imported once at module load, not per delegation)
+from app.agents.navya_adversarial import NavyaAdversarial
+from app.agents.karan_adversarial import KaranAdversarial
+from app.agents.deepika_adversarial import DeepikaAdversarial
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# CHAT HEURISTICS
+# =============================================================================
+
+# Common typo corrections (applied to lowercased text)
+TYPO_CORRECTIONS = {
+    "webiste": "website",
+    "buisness": "business",
+    "commerce": "e-commerce",
+}
+
+# One alternation -> a single scan of the message instead of one per typo
+_TYPO_RE = re.compile(r'\b(' + '|'.join(map(re.escape, TYPO_CORRECTIONS)) + r')\b')
+
+# Thinking level triggers (plain substring matches on lowercased text)
+DEEP_TRIGGERS = [
+    "enterprise", "security critical", "payment processing",
+    "multi-tenant", "complex business logic", "scalable"
+]
+EXTENDED_TRIGGERS = [
+    "architecture", "how should", "best way",
+    "recommend", "which approach", "confused",
+    "not sure", "maybe", "possibly"
+]
+
+_DEEP_RE = re.compile('|'.join(map(re.escape, DEEP_TRIGGERS)))
+_EXTENDED_RE = re.compile('|'.join(map(re.escape, EXTENDED_TRIGGERS)))
+
+# Chat replies are short (SIMPLE, <= 200 tokens) and a user is waiting: if
+# the model hasn't answered after this long, race it against its fallback
+CHAT_HEDGE_MS = 3_000
+
+# Messages that are only a greeting or a thanks get a canned reply, no AI call
+TRIVIAL_REPLIES = {
+    "greeting": "Hi! I'm Tilotma. What would you like to build?",
+    "thanks": "You're welcome! Anything else you'd like to add?",
+}
+_TRIVIAL_RES = {
+    "greeting": re.compile(
+        r'(hi+|hello|hey+|namaste|good (morning|afternoon|evening))( there| tilotma)?[\s!.,]*'
+    ),
+    "thanks": re.compile(r'(thanks|thank you|thx|ty)( so much| a lot)?[\s!.,]*'),
+}
+
+# Words that count for context retrieval (3+ letters, lowercased)
+_TERM_RE = re.compile(r'[a-z0-9]{3,}')
+
+
+# =============================================================================
+# PROMPT TEMPLATES
+# =============================================================================
+
+GREETING_PROMPT = """User: "{message}"
+
+You're Tilotma. Greet and ask what to build. 15 words max."""
+
+REQUIREMENTS_PROMPT = """Requirements gathering.
+
+Context:
+{context}
+
+New: {message}
+
+Ask 1 clarifying question (20 words max)."""
+
+GENERAL_PROMPT = """Phase: {phase}
+
+Recent context:
+{context}
+
+New message: {message}
+
+Respond appropriately. Keep it short."""
+
+# Analysis prompts keep their fixed instructions in the system prompt and
+# send only the per-call data as the message, so the prefix is byte-identical
+# across calls and eligible for provider prompt caching
+READINESS_INSTRUCTIONS = """You check whether a conversation has enough info to build a software spec.
+
+Respond ONLY with this JSON (no explanation):
+{
+  "is_ready": true or false,
+  "confidence": 0.0 to 1.0,
+  "missing_info": ["what's missing"],
+  "detected_features": ["feature1", "feature2"],
+  "estimated_complexity": 1 to 10,
+  "reasoning": "one sentence why"
+}"""
+
+READINESS_PROMPT = """Analyze this conversation briefly:
+
+{conversation}"""
+
+VALIDATION_INSTRUCTIONS = """You review output produced by another agent.
+
+Respond ONLY with JSON:
+{
+  "is_valid": true/false,
+  "issues": ["issue1"],
+  "suggestions": ["suggestion1"],
+  "should_retry": true/false,
+  "feedback_for_agent": "what to improve"
+}"""
+
+VALIDATION_PROMPT = """Review this output from {agent_name}:
+
+Expected: {expected_format}
+
+OUTPUT (truncated):
+{output}"""
+
+QC_INSTRUCTIONS = """You are the final quality gate before a project is delivered.
+
+Respond ONLY with JSON:
+{
+  "approved": true/false,
+  "issues": ["issue1"],
+  "ready_for_deployment": true/false
+}"""
+
+QC_PROMPT = """Outputs: {outputs}
+Complexity: {complexity}/10"""
+
+# Structured output schemas (provider enforces these, so parsing can't fail).
+# Lists are capped so the reply fits the small max_tokens budgets below.
+READINESS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "is_ready": {"type": "boolean"},
+        "confidence": {"type": "number"},
+        "missing_info": {"type": "array", "items": {"type": "string"}, "maxItems": 5},
+        "detected_features": {"type": "array", "items": {"type": "string"}, "maxItems": 8},
+        "estimated_complexity": {"type": "integer"},
+        "reasoning": {"type": "string"},
+    },
+    "required": [
+        "is_ready", "confidence", "missing_info",
+        "detected_features", "estimated_complexity", "reasoning"
+    ],
+}
+
+VALIDATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "is_valid": {"type": "boolean"},
+        "issues": {"type": "array", "items": {"type": "string"}, "maxItems": 3},
+        "suggestions": {"type": "array", "items": {"type": "string"}, "maxItems": 3},
+        "should_retry": {"type": "boolean"},
+        "feedback_for_agent": {"type": "string"},
+    },
+    "required": ["is_valid", "issues", "suggestions", "should_retry", "feedback_for_agent"],
+}
+
+# Final quality verdicts, shared by all sessions. The gate only sees which
+# outputs are present plus the complexity, so a repeat combination gets the
+# same answer without another AI call (LRU, oldest evicted first).
+QC_VERDICT_CACHE_SIZE = 64
+_qc_verdicts: "OrderedDict[Tuple[frozenset, int], Tuple[bool, List[str]]]" = OrderedDict()
+
+# Parts of the generated code reviewed separately (smaller prompts and
+# replies, all in flight at once), with the language each is reviewed as
+REVIEW_PARTS = (("backend", "python"), ("frontend", "typescript"))
+
+# How long batched adversarial reviews may take (pooled by the fleet dispatcher)
+REVIEW_BATCH_LATENCY_MS = 600_000
+
+
+def _merge_reviews(reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine one reviewer's per-part results: counts add up, lists concatenate.
+    
+    Replies come from a model, so nothing is assumed about their shape - a
+    missing or mistyped count/list in one part (or a part that isn't a dict
+    at all) is skipped rather than sinking the other parts.
+    """
+    merged: Dict[str, Any] = {}
+    for review in reviews:
+        if not isinstance(review, dict):
+            continue
+        for key, value in review.items():
+            current = merged.get(key)
+            if key == "error":
+                merged[key] = f"{current}; {value}" if current else value
+            elif isinstance(value, int) and not isinstance(value, bool):
+                merged[key] = (current if isinstance(current, int) else 0) + value
+            elif isinstance(value, list):
+                merged[key] = (current if isinstance(current, list) else []) + value
+            elif key not in merged:
+                merged[key] = value
+    return merged
+
+
 # =============================================================================
 # DATA STRUCTURES
 # =============================================================================
@@ -72,7 +277,7 @@ class ThinkingLevel(Enum):
     DEEP = 3           # Enterprise apps, critical decisions
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """A single conversation message"""
     role: str  # 'user' or 'assistant'
@@ -83,17 +288,40 @@ class Message:
     model_used: str = ""
     thinking_level: ThinkingLevel = ThinkingLevel.STANDARD
     
+    # "role: content" prompt lines truncated to 50/100/200 chars, built once
+    line_short: str = field(init=False, repr=False)
+    line_medium: str = field(init=False, repr=False)
+    line_long: str = field(init=False, repr=False)
+    
+    # to_dict() result and search terms, built on first use (messages are never edited)
+    _dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _terms: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.line_short = f"{self.role}: {self.content[:50]}"
+        self.line_medium = f"{self.role}: {self.content[:100]}"
+        self.line_long = f"{self.role}: {self.content[:200]}"
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for storage"""
-        return {
-            "role": self.role,
-            "content": self.content,
-            "timestamp": self.timestamp.isoformat(),
-            "tokens_used": self.tokens_used,
-            "cost": self.cost,
-            "model_used": self.model_used,
-            "thinking_level": self.thinking_level.value
-        }
+        """Convert to dictionary for storage (cached - treat as read-only)"""
+        if self._dict is None:
+            self._dict = {
+                "role": self.role,
+                "content": self.content,
+                "timestamp": self.timestamp.isoformat(),
+                "tokens_used": self.tokens_used,
+                "cost": self.cost,
+                "model_used": self.model_used,
+                "thinking_level": self.thinking_level.value
+            }
+        return self._dict
+    
+    @property
+    def terms(self) -> List[str]:
+        """Lowercased search terms of the content (cached - treat as read-only)"""
+        if self._terms is None:
+            self._terms = _TERM_RE.findall(self.content.lower())
+        return self._terms
 
 
 @dataclass
@@ -110,14 +338,114 @@ class ProjectContext:
     last_agent_called: Optional[str] = None
     retry_count: Dict[str, int] = field(default_factory=dict)
     
+    # Rolling windows of each message's pre-truncated prompt line, kept in
+    # step with messages so handlers don't rebuild the history every turn
+    recent_short: deque = field(default_factory=lambda: deque(maxlen=3), repr=False)
+    recent_medium: deque = field(default_factory=lambda: deque(maxlen=5), repr=False)
+    recent_long: deque = field(default_factory=lambda: deque(maxlen=10), repr=False)
+    
+    # Optional async persistence hook (e.g. DB write), run off the chat path
+    on_message: Optional[Callable[[Message], Awaitable[None]]] = field(default=None, repr=False)
+    pending_writes: Set[asyncio.Task] = field(default_factory=set, repr=False)
+    
     def add_message(self, message: Message):
         """Add message and update costs"""
         self.messages.append(message)
         self.total_cost += message.cost
+        
+        self.recent_short.append(message.line_short)
+        self.recent_medium.append(message.line_medium)
+        self.recent_long.append(message.line_long)
+        
+        # Fire-and-forget persistence - the reply doesn't wait for the write
+        if self.on_message is not None:
+            task = asyncio.get_running_loop().create_task(self.on_message(message))
+            self.pending_writes.add(task)
+            task.add_done_callback(self._write_done)
+    
+    def _write_done(self, task: asyncio.Task):
+        """Forget a finished write and log it if it failed"""
+        self.pending_writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("❌ Failed to persist message: %s", task.exception())
+    
+    async def flush(self):
+        """Wait for all in-flight message writes (call before shutdown)"""
+        if self.pending_writes:
+            await asyncio.gather(*self.pending_writes, return_exceptions=True)
     
     def get_recent_messages(self, count: int = 20) -> List[Message]:
         """Get last N messages for context"""
         return self.messages[-count:]
+    
+    def get_relevant_context(self, limit: int = 10, top_k: int = 8) -> str:
+        """
+        Pick the most useful messages for analysis prompts.
+        
+        Short conversations are returned whole. Longer ones are ranked
+        two ways - BM25 against the latest user message, and recency -
+        and the rankings are merged with reciprocal rank fusion, so an
+        early message naming the project or a key feature isn't evicted
+        just because it's old. Each pick brings its neighbours along
+        (question + answer) until `limit` messages are selected.
+        
+        Args:
+            limit: Max messages to include
+            top_k: Max fused hits to expand with neighbours
+        
+        Returns:
+            "role: content" lines (200 chars max each), oldest first
+        """
+        
+        count = len(self.messages)
+        if count <= limit:
+            return "\n".join(self.recent_long)
+        
+        # Terms are tokenized once per message and reused on later turns
+        query = next(
+            (msg for msg in reversed(self.messages) if msg.role == "user"), None
+        )
+        query_terms = set(query.terms) if query else set()
+        documents = [msg.terms for msg in self.messages]
+        
+        # BM25 (k1=1.5, b=0.75) over the query terms only
+        average_length = sum(map(len, documents)) / count or 1
+        document_frequency = Counter(
+            term for document in documents for term in set(document) & query_terms
+        )
+        idf = {
+            term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+        scores = []
+        for document in documents:
+            term_counts = Counter(term for term in document if term in idf)
+            length_norm = 1.5 * (0.25 + 0.75 * len(document) / average_length)
+            scores.append(sum(
+                idf[term] * frequency * 2.5 / (frequency + length_norm)
+                for term, frequency in term_counts.items()
+            ))
+        
+        lexical_ranking = sorted(
+            (index for index in range(count) if scores[index] > 0),
+            key=lambda index: scores[index],
+            reverse=True
+        )[:limit]
+        recency_ranking = range(count - 1, count - 1 - limit, -1)
+        
+        # Reciprocal rank fusion (k=60)
+        fused = Counter()
+        for ranking in (lexical_ranking, recency_ranking):
+            for rank, index in enumerate(ranking):
+                fused[index] += 1 / (60 + rank + 1)
+        
+        selected = set()
+        for index, _ in fused.most_common(top_k):
+            for neighbour in (index, index - 1, index + 1):
+                if len(selected) < limit and 0 <= neighbour < count:
+                    selected.add(neighbour)
+        
+        return "\n".join(self.messages[index].line_long for index in sorted(selected))
 
 
 @dataclass
@@ -166,36 +494,89 @@ class Tilotma:
     - Selects appropriate thinking level
     """
     
-    def __init__(self, project_id: str, user_id: str):
+    def __init__(
+        self,
+        project_id: str,
+        user_id: str,
+        on_message: Optional[Callable[[Message], Awaitable[None]]] = None,
+        max_concurrency: Optional[int] = None,
+        rate_limit: Optional[int] = None
+    ):
         """
         Initialize Tilotma for a project.
         
         Args:
             project_id: UUID of the project
             user_id: UUID of the user who owns the project
+            on_message: Optional async callback to persist each message.
+                Runs in the background so it never delays a reply.
+            max_concurrency: Optional cap on simultaneous AI requests
+                (shared AI Router setting, None keeps the current value)
+            rate_limit: Optional cap on AI requests per minute
+                (shared AI Router setting, None keeps the current value)
         """
         self.project_id = project_id
         self.user_id = user_id
         self.logger = logging.getLogger(f"tilotma.{project_id}")
         
+        # Tune AI Router limits for this orchestrator's workload
+        if max_concurrency is not None or rate_limit is not None:
+            ai_router.configure_limits(max_concurrency=max_concurrency, rate_limit=rate_limit)
+        
         # Initialize project context
         self.context = ProjectContext(
             project_id=project_id,
-            user_id=user_id
+            user_id=user_id,
+            on_message=on_message
         )
         
-        # Agent registry (for delegation)
-        self.agents = {
-            "saanvi": None,     # Requirements Analyst
-            "kavya": None,      # Designer
-            "shubham": None,    # Backend Developer
-            "aanya": None,      # Web Frontend Developer
-            "aarav": None,      # Mobile Developer
-            "navya": None,      # Code Reviewer
-            "pranav": None      # Deployment Engineer
-        }
+        # Message count at the last AI readiness check
+        self._last_readiness_msg_idx = 0
         
-        self.logger.info(f"👑 Tilotma initialized for project {project_id}")
+        self.logger.info("👑 Tilotma initialized for project %s", project_id)
+    
+    # =========================================================================
+    # AGENT REGISTRY - created on first delegation, then reused
+    # =========================================================================
+    
+    @cached_property
+    def saanvi(self):
+        """Requirements Analyst"""
+        from app.agents.saanvi import Saanvi
+        return Saanvi(self.project_id, self.user_id)
+    
+    @cached_property
+    def shubham(self):
+        """Backend Developer"""
+        from app.agents.shubham import Shubham
+        return Shubham(self.project_id, self.user_id)
+    
+    @cached_property
+    def aanya(self):
+        """Web Frontend Developer"""
+        from app.agents.aanya import Aanya
+        return Aanya(self.project_id)
+    
+    @cached_property
+    def pranav(self):
+        """Deployment Engineer"""
+        from app.agents.pranav import Pranav
+        return Pranav(self.project_id)
+    
+    @cached_property
+    def navya(self) -> NavyaAdversarial:
+        """Code Reviewer - logic errors"""
+        return NavyaAdversarial(self.project_id)
+    
+    @cached_property
+    def karan(self) -> KaranAdversarial:
+        """Code Reviewer - security"""
+        return KaranAdversarial(self.project_id)
+    
+    @cached_property
+    def deepika(self) -> DeepikaAdversarial:
+        """Code Reviewer - performance"""
+        return DeepikaAdversarial(self.project_id)
     
     # =========================================================================
     # CHAT MODULE - User Interaction
@@ -220,21 +601,13 @@ class Tilotma:
             Assistant's response
         """
         
-        self.logger.info(f"💬 User message received: {user_message[:100]}...")
-        
-        # Step 1: Understand message (with typo correction internally)
-        understood_message = self._understand_with_typo_correction(user_message)
-        
-        # Step 2: Add user message to context
-        user_msg = Message(
-            role="user",
-            content=user_message  # Keep original for record
-        )
-        self.context.add_message(user_msg)
+        # Steps 1-3: Understand, record, pick thinking level
+        understood_message = self._begin_turn(user_message)
         
-        # Step 3: Determine thinking level
-        thinking_level = self._determine_thinking_level(understood_message)
-        self.context.thinking_level = thinking_level
+        # Fast path: bare greeting/thanks - nothing to generate or analyse
+        canned = self._fast_path_reply(understood_message)
+        if canned is not None:
+            return canned
         
         # Step 4: Generate response based on phase
         if self.context.phase == ConversationPhase.GREETING:
@@ -253,9 +626,155 @@ class Tilotma:
         await self._check_phase_transition()
         
         # Step 6: Return response
-        self.logger.info(f"✅ Tilotma response: {response[:100]}...")
+        self.logger.info("✅ Tilotma response: %s...", response[:100])
         return response
     
+    async def chat_stream(self, user_message: str) -> AsyncIterator[str]:
+        """
+        Streaming variant of chat() - yields the reply as it is generated.
+        
+        Same workflow as chat(), but the user sees the first tokens
+        instead of waiting for the whole reply. The assistant message is
+        saved (and the phase checked) once the stream has finished.
+        
+        Example:
+            async for chunk in tilotma.chat_stream("I need a website"):
+                print(chunk, end="")
+        
+        Args:
+            user_message: Message from the user
+        
+        Yields:
+            Chunks of the assistant's response
+        """
+        
+        # Steps 1-3: Understand, record, pick thinking level
+        understood_message = self._begin_turn(user_message)
+        
+        # Fast path: bare greeting/thanks - nothing to generate or analyse
+        canned = self._fast_path_reply(understood_message)
+        if canned is not None:
+            yield canned
+            return
+        
+        phase = self.context.phase
+        
+        # Step 4: Stream response based on phase
+        if phase == ConversationPhase.GREETING:
+            prompt = self._greeting_prompt(understood_message)
+            max_tokens, thinking_level = 50, ThinkingLevel.STANDARD
+        
+        elif phase in (ConversationPhase.REQUIREMENTS_GATHERING, ConversationPhase.CLARIFICATION):
+            prompt = self._requirements_prompt(understood_message)
+            max_tokens, thinking_level = 100, self.context.thinking_level
+        
+        else:
+            prompt = self._general_prompt(understood_message)
+            max_tokens, thinking_level = 200, ThinkingLevel.STANDARD
+        
+        stream = ai_router.stream_generate(
+            messages=[{"role": "user", "content": prompt}],
+            task_type="chat",
+            complexity=TaskComplexity.SIMPLE,
+            max_tokens=max_tokens
+        )
+        async for chunk in stream:
+            yield chunk
+        
+        self._save_reply(stream.response, thinking_level)
+        
+        if phase == ConversationPhase.GREETING:
+            self.context.phase = ConversationPhase.REQUIREMENTS_GATHERING
+        
+        # Step 5: Check readiness for next phase
+        await self._check_phase_transition()
+        
+        self.logger.info("✅ Tilotma streamed response: %s...", stream.response.content[:100])
+    
+    def _begin_turn(self, user_message: str) -> str:
+        """
+        Record the user's message and set the thinking level.
+        
+        Args:
+            user_message: Message from the user
+        
+        Returns:
+            Understood version of the message (typos corrected)
+        """
+        
+        self.logger.info("💬 User message received: %s...", user_message[:100])
+        
+        # Step 1: Understand message (with typo correction internally)
+        understood_message = self._understand_with_typo_correction(user_message)
+        
+        # Step 2: Add user message to context
+        user_msg = Message(
+            role="user",
+            content=user_message  # Keep original for record
+        )
+        self.context.add_message(user_msg)
+        
+        # Step 3: Determine thinking level
+        thinking_level = self._determine_thinking_level(understood_message)
+        self.context.thinking_level = thinking_level
+        
+        return understood_message
+    
+    def _trivial_intent(self, text: str) -> Optional[str]:
+        """
+        Classify messages that need no AI call.
+        
+        Only whole-message matches count - "hi, I need a shop" is not a
+        greeting. Greetings are only trivial before requirements start,
+        after that "hi" may be the start of something new.
+        
+        Args:
+            text: Understood (lowercased) message
+        
+        Returns:
+            "greeting", "thanks" or None
+        """
+        
+        text = text.strip()
+        if self.context.phase == ConversationPhase.GREETING and _TRIVIAL_RES["greeting"].fullmatch(text):
+            return "greeting"
+        if _TRIVIAL_RES["thanks"].fullmatch(text):
+            return "thanks"
+        return None
+    
+    def _fast_path_reply(self, understood_message: str) -> Optional[str]:
+        """
+        Answer a trivial message locally (no AI call, no readiness check).
+        
+        Returns:
+            The canned reply (already saved to context), or None
+        """
+        
+        intent = self._trivial_intent(understood_message)
+        if intent is None:
+            return None
+        
+        reply = TRIVIAL_REPLIES[intent]
+        self.context.add_message(Message(role="assistant", content=reply))
+        
+        if intent == "greeting":
+            self.context.phase = ConversationPhase.REQUIREMENTS_GATHERING
+        
+        self.logger.info("⚡ Fast path (%s), no AI call", intent)
+        return reply
+    
+    def _save_reply(self, response, thinking_level: ThinkingLevel):
+        """Add the assistant's reply to the conversation history"""
+        assistant_msg = Message(
+            role="assistant",
+            content=response.content,
+            tokens_used=response.output_tokens,
+            cost=response.cost_estimate,
+            model_used=response.model_id,
+            thinking_level=thinking_level
+        )
+        self.context.add_message(assistant_msg)
+    
     def _understand_with_typo_correction(self, text: str) -> str:
         """
         Understand user message, correcting typos internally.
@@ -276,20 +795,10 @@ class Tilotma:
             Understood version (typos corrected for AI processing)
         """
         
-        # Common typo corrections
-        corrections = {
-            r'\bwebiste\b': 'website',
-            r'\bbuisness\b': 'business',
-            r'\bcommerce\b': 'e-commerce',
-            r'\bpayment\b': 'payment',
-            r'\bcontact\b': 'contact',
-            r'\bresponsive\b': 'responsive',
-            r'\bdatabase\b': 'database',
-        }
-        
-        understood = text.lower()
-        for pattern, replacement in corrections.items():
-            understood = re.sub(pattern, replacement, understood, flags=re.IGNORECASE)
+        understood = _TYPO_RE.sub(
+            lambda match: TYPO_CORRECTIONS[match.group(1)],
+            text.lower()
+        )
         
         return understood
     
@@ -312,24 +821,16 @@ class Tilotma:
         message_lower = message.lower()
         
         # Deep thinking triggers
-        deep_triggers = [
-            "enterprise", "security critical", "payment processing",
-            "multi-tenant", "complex business logic", "scalable"
-        ]
-        if any(trigger in message_lower for trigger in deep_triggers):
+        if _DEEP_RE.search(message_lower) is not None:
             return ThinkingLevel.DEEP
         
         # Extended thinking triggers
-        extended_triggers = [
-            "architecture", "how should", "best way",
-            "recommend", "which approach", "confused",
-            "not sure", "maybe", "possibly"
-        ]
-        if any(trigger in message_lower for trigger in extended_triggers):
+        if _EXTENDED_RE.search(message_lower) is not None:
             return ThinkingLevel.EXTENDED
         
-        # Standard thinking (greetings, simple questions)
-        if len(message.split()) < 5:
+        # Standard thinking (greetings, simple questions) - fewer than 5 words;
+        # maxsplit stops after the 5th word instead of splitting the whole message
+        if len(message.split(maxsplit=4)) < 5:
             return ThinkingLevel.STANDARD
         
         # Default: Normal thinking
@@ -340,34 +841,27 @@ class Tilotma:
         Handle initial greeting phase - ULTRA SHORT.
         """
         
-        # MINIMAL prompt
-        user_prompt = f"""User: "{message[:50]}"
-
-You're Tilotma. Greet and ask what to build. 15 words max."""
-        
         response = await ai_router.generate(
-            messages=[{"role": "user", "content": user_prompt}],
+            messages=[{"role": "user", "content": self._greeting_prompt(message)}],
             task_type="chat",
             complexity=TaskComplexity.SIMPLE,
-            max_tokens=50  # Reduced from 200!
+            max_tokens=50,  # Reduced from 200!
+            semantic_cache=True,
+            hedge_ms=CHAT_HEDGE_MS
         )
         
         # Save response
-        assistant_msg = Message(
-            role="assistant",
-            content=response.content,
-            tokens_used=response.output_tokens,
-            cost=response.cost_estimate,
-            model_used=response.model_id,
-            thinking_level=ThinkingLevel.STANDARD
-        )
-        self.context.add_message(assistant_msg)
+        self._save_reply(response, ThinkingLevel.STANDARD)
         
         # Transition to requirements gathering
         self.context.phase = ConversationPhase.REQUIREMENTS_GATHERING
         
         return response.content
     
+    def _greeting_prompt(self, message: str) -> str:
+        """MINIMAL greeting prompt"""
+        return GREETING_PROMPT.format(message=message[:50])
+    
     async def _handle_requirements_gathering(self, message: str) -> str:
         """
         Handle requirements gathering phase.
@@ -375,48 +869,29 @@ You're Tilotma. Greet and ask what to build. 15 words max."""
         Ultra-short version to avoid token limits.
         """
         
-        # Get only last 3 messages (was 5)
-        recent_messages = self.context.get_recent_messages(3)
-        
-        # Build VERY short context (max 50 chars per message)
-        context_lines = []
-        for msg in recent_messages:
-            short_content = msg.content[:50] if len(msg.content) > 50 else msg.content
-            context_lines.append(f"{msg.role}: {short_content}")
-        
-        context = "\n".join(context_lines)
-        
-        # ULTRA SHORT prompt (under 100 words total)
-        user_prompt = f"""Requirements gathering.
-
-Context:
-{context}
-
-New: {message[:100]}
-
-Ask 1 clarifying question (20 words max)."""
-        
         # Force SIMPLE complexity
         response = await ai_router.generate(
-            messages=[{"role": "user", "content": user_prompt}],
+            messages=[{"role": "user", "content": self._requirements_prompt(message)}],
             task_type="chat",  # Changed from "analysis" to "chat" for faster model
             complexity=TaskComplexity.SIMPLE,  # Always SIMPLE
-            max_tokens=100  # Reduced from 200 to 100!
+            max_tokens=100,  # Reduced from 200 to 100!
+            hedge_ms=CHAT_HEDGE_MS
         )
         
         # Save response
-        assistant_msg = Message(
-            role="assistant",
-            content=response.content,
-            tokens_used=response.output_tokens,
-            cost=response.cost_estimate,
-            model_used=response.model_id,
-            thinking_level=self.context.thinking_level
-        )
-        self.context.add_message(assistant_msg)
+        self._save_reply(response, self.context.thinking_level)
         
         return response.content
     
+    def _requirements_prompt(self, message: str) -> str:
+        """ULTRA SHORT requirements prompt (under 100 words total)"""
+        
+        # Last 3 messages, max 50 chars each (VERY short context)
+        return REQUIREMENTS_PROMPT.format(
+            context="\n".join(self.context.recent_short),
+            message=message[:100]
+        )
+    
     async def _handle_clarification(self, message: str) -> str:
         """
         Handle clarification phase - user answering specific questions.
@@ -442,40 +917,28 @@ Ask 1 clarifying question (20 words max)."""
             Appropriate response
         """
         
-        # Get recent context (last 5 messages)
-        recent_messages = self.context.get_recent_messages(5)
-        context = "\n".join([
-            f"{msg.role}: {msg.content[:100]}" for msg in recent_messages
-        ])
-        
-        # Simple prompt (no system message!)
-        user_prompt = f"""Phase: {self.context.phase.value}
-
-Recent context:
-{context}
-
-New message: {message}
-
-Respond appropriately. Keep it short."""
-        
         response = await ai_router.generate(
-            messages=[{"role": "user", "content": user_prompt}],
+            messages=[{"role": "user", "content": self._general_prompt(message)}],
             task_type="chat",
             complexity=TaskComplexity.SIMPLE,
-            max_tokens=200
+            max_tokens=200,
+            hedge_ms=CHAT_HEDGE_MS
         )
         
-        assistant_msg = Message(
-            role="assistant",
-            content=response.content,
-            tokens_used=response.output_tokens,
-            cost=response.cost_estimate,
-            model_used=response.model_id
-        )
-        self.context.add_message(assistant_msg)
+        self._save_reply(response, ThinkingLevel.STANDARD)
         
         return response.content
     
+    def _general_prompt(self, message: str) -> str:
+        """Simple prompt for other phases (no system message!)"""
+        
+        # Recent context (last 5 messages, max 100 chars each)
+        return GENERAL_PROMPT.format(
+            phase=self.context.phase.value,
+            context="\n".join(self.context.recent_medium),
+            message=message
+        )
+    
     async def _check_phase_transition(self):
         """
         Check if ready to transition to next phase.
@@ -489,20 +952,57 @@ Respond appropriately. Keep it short."""
             if len(self.context.messages) < 3:
                 return  # Too early to check
             
+            # Skip the AI call when nothing new was said since the last check
+            if not self._has_new_information():
+                return
+            
+            self._last_readiness_msg_idx = len(self.context.messages)
+            
             try:
                 # Check if ready for spec generation
                 readiness = await self._check_readiness_for_spec()
                 
                 if readiness.is_ready and readiness.confidence > 0.7:
-                    self.logger.info(f"✅ Ready for spec generation! Confidence: {readiness.confidence}")
+                    self.logger.info("✅ Ready for spec generation! Confidence: %s", readiness.confidence)
                     self.context.phase = ConversationPhase.READY_FOR_SPEC
                     self.context.requirements_detected = True
                     self.context.complexity_estimate = readiness.estimated_complexity
             except Exception as e:
                 # Don't fail the whole chat if readiness check fails
-                self.logger.warning(f"⚠️ Readiness check failed: {e}")
+                self.logger.warning("⚠️ Readiness check failed: %s", e)
                 # Just continue in current phase
     
+    def _has_new_information(self, min_user_messages: int = 2, min_novel_terms: int = 3) -> bool:
+        """
+        Cheap local check before spending an AI call on readiness.
+        
+        Requires at least `min_user_messages` user messages since the
+        last readiness check, and that they add `min_novel_terms` words
+        not used in earlier user messages ("ok", "thanks" don't count).
+        
+        Returns:
+            True if a readiness check is worthwhile
+        """
+        
+        messages = self.context.messages
+        new_user = [
+            msg for msg in messages[self._last_readiness_msg_idx:]
+            if msg.role == "user"
+        ]
+        if len(new_user) < min_user_messages:
+            return False
+        
+        seen_terms = set()
+        for msg in messages[:self._last_readiness_msg_idx]:
+            if msg.role == "user":
+                seen_terms.update(msg.terms)
+        
+        new_terms = set()
+        for msg in new_user:
+            new_terms.update(msg.terms)
+        
+        return len(new_terms - seen_terms) >= min_novel_terms
+    
     async def _check_readiness_for_spec(self) -> ReadinessCheck:
         """
         Check if we have enough information to generate specification.
@@ -516,45 +1016,24 @@ Respond appropriately. Keep it short."""
             ReadinessCheck with details
         """
         
-        # Get only last 10 messages (not 20) to keep context small
-        recent_messages = self.context.get_recent_messages(10)
-        
-        # Build concise conversation summary
-        conversation_summary = []
-        for msg in recent_messages:
-            # Keep messages short
-            content = msg.content[:200] if len(msg.content) > 200 else msg.content
-            conversation_summary.append(f"{msg.role}: {content}")
-        
-        conversation_text = "\n".join(conversation_summary)
+        # Max 10 messages (most relevant + most recent), 200 chars each
+        conversation_text = self.context.get_relevant_context(limit=10)
         
         # Simplified, shorter prompt
-        prompt = f"""Analyze this conversation briefly:
-
-{conversation_text}
-
-Question: Do we have enough info to build a software spec?
-
-Respond ONLY with this JSON (no explanation):
-{{
-  "is_ready": true or false,
-  "confidence": 0.0 to 1.0,
-  "missing_info": ["what's missing"],
-  "detected_features": ["feature1", "feature2"],
-  "estimated_complexity": 1 to 10,
-  "reasoning": "one sentence why"
-}}"""
+        prompt = READINESS_PROMPT.format(conversation=conversation_text)
         
         try:
             response = await ai_router.generate(
                 messages=[{"role": "user", "content": prompt}],
+                system_prompt=READINESS_INSTRUCTIONS,
                 task_type="analysis",
                 complexity=TaskComplexity.SIMPLE,  # Changed from COMPLEX to SIMPLE
-                max_tokens=500  # Reduced from 1000
+                max_tokens=256,  # Schema-bound reply, typically < 150 tokens
+                response_schema=READINESS_SCHEMA
             )
             
-            # Parse JSON response
-            result = json.loads(response.content)
+            # Structured output - always valid JSON
+            result = json_loads(response.content)
             
             return ReadinessCheck(
                 is_ready=result.get("is_ready", False),
@@ -564,19 +1043,8 @@ Respond ONLY with this JSON (no explanation):
                 estimated_complexity=result.get("estimated_complexity", 5),
                 reasoning=result.get("reasoning", "")
             )
-        except json.JSONDecodeError:
-            self.logger.error("Failed to parse readiness check JSON")
-            # Return conservative default
-            return ReadinessCheck(
-                is_ready=False,
-                confidence=0.0,
-                missing_info=["Need more information"],
-                detected_features=[],
-                estimated_complexity=5,
-                reasoning="Unable to analyze - need clearer requirements"
-            )
         except Exception as e:
-            self.logger.error(f"Readiness check failed: {e}")
+            self.logger.error("Readiness check failed: %s", e)
             # Return conservative default
             return ReadinessCheck(
                 is_ready=False,
@@ -602,10 +1070,7 @@ Respond ONLY with this JSON (no explanation):
         self.logger.info("📋 Delegating to Saanvi for requirements analysis...")
         
         try:
-            # Import and create Saanvi instance
-            from app.agents.saanvi import Saanvi
-            
-            saanvi = Saanvi(self.project_id, self.user_id)
+            saanvi = self.saanvi
             
             # Analyze requirements from conversation
             spec = await saanvi.analyze_requirements(
@@ -617,7 +1082,7 @@ Respond ONLY with this JSON (no explanation):
             self.context.last_agent_called = "saanvi"
             self.context.current_phase = "requirements_complete"
             
-            self.logger.info(f"✅ Saanvi completed: Complexity {spec.pricing.complexity_score}/10")
+            self.logger.info("✅ Saanvi completed: Complexity %s/10", spec.pricing.complexity_score)
             
             return {
                 "status": "success",
@@ -628,7 +1093,7 @@ Respond ONLY with this JSON (no explanation):
             }
             
         except Exception as e:
-            self.logger.error(f"❌ Saanvi delegation failed: {e}")
+            self.logger.error("❌ Saanvi delegation failed: %s", e)
             return {
                 "status": "error",
                 "agent": "saanvi",
@@ -669,10 +1134,7 @@ Respond ONLY with this JSON (no explanation):
         self.logger.info("💻 Delegating to Shubham for backend development...")
         
         try:
-            # Import and create Shubham instance
-            from app.agents.shubham import Shubham
-            
-            shubham = Shubham(self.project_id)
+            shubham = self.shubham
             
             # Generate backend code
             backend_code = await shubham.generate_backend(
@@ -684,7 +1146,7 @@ Respond ONLY with this JSON (no explanation):
             self.context.last_agent_called = "shubham"
             self.context.current_phase = "backend_complete"
             
-            self.logger.info(f"✅ Shubham completed: Generated {len(backend_code.get('files', []))} files")
+            self.logger.info("✅ Shubham completed: Generated %s files", len(backend_code.get('files', [])))
             
             return {
                 "status": "success",
@@ -694,7 +1156,7 @@ Respond ONLY with this JSON (no explanation):
             }
             
         except Exception as e:
-            self.logger.error(f"❌ Shubham delegation failed: {e}")
+            self.logger.error("❌ Shubham delegation failed: %s", e)
             return {
                 "status": "error",
                 "agent": "shubham",
@@ -716,10 +1178,7 @@ Respond ONLY with this JSON (no explanation):
         self.logger.info("🌐 Delegating to Aanya for frontend development...")
         
         try:
-            # Import and create Aanya instance
-            from app.agents.aanya import Aanya
-            
-            aanya = Aanya(self.project_id)
+            aanya = self.aanya
             
             # Generate frontend code
             frontend_code = await aanya.generate_frontend(
@@ -732,7 +1191,7 @@ Respond ONLY with this JSON (no explanation):
             self.context.last_agent_called = "aanya"
             self.context.current_phase = "frontend_complete"
             
-            self.logger.info(f"✅ Aanya completed: Generated {len(frontend_code.get('files', []))} files")
+            self.logger.info("✅ Aanya completed: Generated %s files", len(frontend_code.get('files', [])))
             
             return {
                 "status": "success",
@@ -742,7 +1201,7 @@ Respond ONLY with this JSON (no explanation):
             }
             
         except Exception as e:
-            self.logger.error(f"❌ Aanya delegation failed: {e}")
+            self.logger.error("❌ Aanya delegation failed: %s", e)
             return {
                 "status": "error",
                 "agent": "aanya",
@@ -769,12 +1228,67 @@ Respond ONLY with this JSON (no explanation):
             "note": "Mobile development deferred to v2"
         }
     
-    async def delegate_to_navya(self, code: Dict[str, Any]) -> Dict[str, Any]:
+    async def run_build_stage(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the spec → code stage.
+        
+        Shubham (backend) and Kavya (design preview) only need the
+        requirements, so they run concurrently. Aanya (frontend) needs
+        both results and runs once they are done. If either concurrent
+        task raises, the TaskGroup cancels the other.
+        
+        Args:
+            requirements: Requirements spec from Saanvi
+        
+        Returns:
+            Stage status with backend, design and frontend results
+        """
+        
+        self.logger.info("🏗️ Build stage: backend + design in parallel...")
+        
+        async with asyncio.TaskGroup() as group:
+            backend_task = group.create_task(self.delegate_to_shubham(requirements))
+            design_task = group.create_task(self.delegate_to_kavya(requirements))
+        
+        backend_result = backend_task.result()
+        design_result = design_task.result()
+        
+        # Frontend is built against the backend API - don't start without it
+        if backend_result["status"] != "success":
+            return {
+                "status": "error",
+                "stage": "backend",
+                "backend": backend_result,
+                "design": design_result
+            }
+        
+        frontend_result = await self.delegate_to_aanya(requirements, design_result)
+        
+        return {
+            "status": frontend_result["status"],
+            "stage": "frontend",
+            "backend": backend_result,
+            "design": design_result,
+            "frontend": frontend_result
+        }
+        
+    async def delegate_to_navya(
+        self,
+        code: Dict[str, Any],
+        batch_mode: bool = False
+    ) -> Dict[str, Any]:
         """
         Delegate code review to Navya (adversarial).
         
+        The backend and frontend are reviewed separately (one request per
+        reviewer per part, all in parallel) and merged per reviewer.
+        
         Args:
-            code: Generated code (backend + frontend)
+            code: Generated code (backend + optional frontend)
+            batch_mode: Submit the reviews through the fleet dispatcher,
+                which pools them into a provider batch (half price, minutes
+                of latency). Falls back to parallel calls if the batch
+                cannot be run.
         
         Returns:
             Review results with bugs found
@@ -783,27 +1297,63 @@ Respond ONLY with this JSON (no explanation):
         self.logger.info("✅ Delegating to Navya for adversarial code review...")
         
         try:
-            # Import adversarial agents
-            from app.agents.navya_adversarial import NavyaAdversarial
-            from app.agents.karan_adversarial import KaranAdversarial
-            from app.agents.deepika_adversarial import DeepikaAdversarial
+            # The backend is required - the frontend is reviewed when present
+            if not code.get('backend'):
+                raise ValueError("Backend code is required for review")
             
-            # Create agent instances
-            navya = NavyaAdversarial(self.project_id)
-            karan = KaranAdversarial(self.project_id)
-            deepika = DeepikaAdversarial(self.project_id)
+            parts = [(part, file_type) for part, file_type in REVIEW_PARTS if code.get(part)]
+            reviewers = (self.navya, self.karan, self.deepika)
+            jobs = [
+                (reviewer, reviewer.encode_request(code[part], file_type=file_type))
+                for part, file_type in parts
+                for reviewer in reviewers
+            ]
             
-            # Run adversarial competition (parallel)
-            import asyncio
+            # Navya reuses its review of code it has already seen
+            cached = [
+                self.navya.cached_review(request) if reviewer is self.navya else None
+                for reviewer, request in jobs
+            ]
+            requests = [request for (_, request), hit in zip(jobs, cached) if hit is None]
             
-            results = await asyncio.gather(
-                navya.review(code['backend'], file_type="python"),
-                karan.review(code['backend'], file_type="python"),
-                deepika.review(code['backend'], file_type="python"),
-                return_exceptions=True
-            )
+            if batch_mode:
+                # The reviews can wait - the fleet pools them (with any other
+                # queued work) into one half-price batch, and falls back to
+                # direct calls if the batch can't run
+                calls = (
+                    fleet.submit(latency_budget_ms=REVIEW_BATCH_LATENCY_MS, **request)
+                    for request in requests
+                )
+            else:
+                # Run adversarial competition (parallel)
+                calls = (ai_router.generate(**request) for request in requests)
             
-            navya_result, karan_result, deepika_result = results
+            responses = await asyncio.gather(*calls, return_exceptions=True)
+            
+            # A failed reviewer must not sink the others
+            results = []
+            responses = iter(responses)
+            for (reviewer, request), hit in zip(jobs, cached):
+                if hit is not None:
+                    results.append(hit)
+                    continue
+                try:
+                    response = next(responses)
+                    if isinstance(response, Exception):
+                        raise response
+                    result = reviewer.decode_response(response)
+                    if reviewer is self.navya:
+                        self.navya.store_review(request, result)
+                    results.append(result)
+                except Exception as e:
+                    self.logger.error("❌ %s review failed: %s", type(reviewer).__name__, e)
+                    results.append(reviewer._error_response(str(e)))
+            
+            # Results are grouped by part - collect each reviewer's column
+            navya_result, karan_result, deepika_result = (
+                _merge_reviews(results[index::len(reviewers)])
+                for index in range(len(reviewers))
+            )
             
             # Count total bugs
             total_bugs = (
@@ -816,7 +1366,7 @@ Respond ONLY with this JSON (no explanation):
             self.context.last_agent_called = "navya"
             self.context.current_phase = "review_complete"
             
-            self.logger.info(f"✅ Adversarial review completed: {total_bugs} issues found")
+            self.logger.info("✅ Adversarial review completed: %s issues found", total_bugs)
             
             return {
                 "status": "success",
@@ -828,7 +1378,7 @@ Respond ONLY with this JSON (no explanation):
             }
             
         except Exception as e:
-            self.logger.error(f"❌ Navya delegation failed: {e}")
+            self.logger.error("❌ Navya delegation failed: %s", e)
             return {
                 "status": "error",
                 "agent": "navya",
@@ -849,10 +1399,7 @@ Respond ONLY with this JSON (no explanation):
         self.logger.info("🚀 Delegating to Pranav for deployment...")
         
         try:
-            # Import and create Pranav instance
-            from app.agents.pranav import Pranav
-            
-            pranav = Pranav(self.project_id)
+            pranav = self.pranav
             
             # Deploy to production
             deployment = await pranav.deploy(
@@ -866,7 +1413,7 @@ Respond ONLY with this JSON (no explanation):
             self.context.current_phase = "deployed"
             self.context.deployment_url = deployment.get('url')
             
-            self.logger.info(f"✅ Pranav completed: Deployed to {deployment.get('url')}")
+            self.logger.info("✅ Pranav completed: Deployed to %s", deployment.get('url'))
             
             return {
                 "status": "success",
@@ -877,7 +1424,7 @@ Respond ONLY with this JSON (no explanation):
             }
             
         except Exception as e:
-            self.logger.error(f"❌ Pranav delegation failed: {e}")
+            self.logger.error("❌ Pranav delegation failed: %s", e)
             return {
                 "status": "error",
                 "agent": "pranav",
@@ -908,37 +1455,30 @@ Respond ONLY with this JSON (no explanation):
             ValidationResult with details
         """
         
-        self.logger.info(f"🔍 Validating output from {agent_name}...")
+        self.logger.info("🔍 Validating output from %s...", agent_name)
         
         # Truncate output for validation (first 1000 chars)
         output_str = str(output)[:1000]
         
         # Simplified prompt
-        prompt = f"""Review this output from {agent_name}:
-
-OUTPUT (truncated):
-{output_str}
-
-Expected: {expected_format or 'Any format'}
-
-Respond ONLY with JSON:
-{{
-  "is_valid": true/false,
-  "issues": ["issue1"],
-  "suggestions": ["suggestion1"],
-  "should_retry": true/false,
-  "feedback_for_agent": "what to improve"
-}}"""
+        prompt = VALIDATION_PROMPT.format(
+            agent_name=agent_name,
+            output=output_str,
+            expected_format=expected_format or 'Any format'
+        )
         
         try:
             response = await ai_router.generate(
                 messages=[{"role": "user", "content": prompt}],
+                system_prompt=VALIDATION_INSTRUCTIONS,
                 task_type="analysis",
                 complexity=TaskComplexity.SIMPLE,
-                max_tokens=300
+                max_tokens=192,  # Schema-bound reply, typically < 100 tokens
+                response_schema=VALIDATION_SCHEMA
             )
             
-            result = json.loads(response.content)
+            # Structured output - always valid JSON
+            result = json_loads(response.content)
             
             return ValidationResult(
                 is_valid=result.get("is_valid", False),
@@ -948,7 +1488,7 @@ Respond ONLY with JSON:
                 feedback_for_agent=result.get("feedback_for_agent", "")
             )
         except Exception as e:
-            self.logger.error(f"Validation failed: {e}")
+            self.logger.error("Validation failed: %s", e)
             # Return permissive default
             return ValidationResult(
                 is_valid=True,
@@ -990,15 +1530,15 @@ Respond ONLY with JSON:
         retry_num = self.context.retry_count[agent_name]
         
         if retry_num > 3:
-            self.logger.error(f"❌ {agent_name} failed after 3 retries. Human escalation needed.")
+            self.logger.error("❌ %s failed after 3 retries. Human escalation needed.", agent_name)
             return {
                 "status": "failed",
                 "error": "Max retries exceeded",
                 "needs_human": True
             }
         
-        self.logger.warning(f"🔄 Retrying {agent_name} (attempt {retry_num}/3)...")
-        self.logger.info(f"💬 Feedback: {feedback}")
+        self.logger.warning("🔄 Retrying %s (attempt %s/3)...", agent_name, retry_num)
+        self.logger.info("💬 Feedback: %s", feedback)
         
         # Call agent again with feedback
         # Implementation depends on agent type
@@ -1031,7 +1571,7 @@ Respond ONLY with JSON:
             Better output hopefully
         """
         
-        self.logger.warning(f"⚡ Escalating {agent_name} to Claude Opus for better results...")
+        self.logger.warning("⚡ Escalating %s to Claude Opus for better results...", agent_name)
         
         # TODO: Implement model escalation
         # This would involve calling the agent again but forcing Claude Opus
@@ -1064,45 +1604,57 @@ Respond ONLY with JSON:
         
         self.logger.info("🎯 Running final quality check...")
         
-        # Simplified summary of outputs
-        output_summary = {}
-        for key, value in all_outputs.items():
-            # Just track presence, not full content
-            output_summary[key] = "present" if value else "missing"
+        # Simplified summary of outputs (just presence, not full content)
+        output_summary = {
+            key: "present" if value else "missing"
+            for key, value in all_outputs.items()
+        }
         
-        prompt = f"""Final quality gate check.
-
-Outputs: {json.dumps(output_summary)}
-Complexity: {self.context.complexity_estimate}/10
-
-Respond ONLY with JSON:
-{{
-  "approved": true/false,
-  "issues": ["issue1"],
-  "ready_for_deployment": true/false
-}}"""
+        verdict_key = (frozenset(output_summary.items()), self.context.complexity_estimate)
+        if verdict_key in _qc_verdicts:
+            _qc_verdicts.move_to_end(verdict_key)
+            approved, issues = _qc_verdicts[verdict_key]
+            self.logger.info("♻️  Reusing final quality verdict (approved=%s)", approved)
+            return approved, list(issues)
+        
+        # Canonical JSON so dict order never changes the prompt
+        prompt = QC_PROMPT.format(
+            outputs=json.dumps(output_summary, sort_keys=True, separators=(",", ":")),
+            complexity=self.context.complexity_estimate
+        )
         
         try:
-            response = await ai_router.generate(
+            # Runs after the build - shares a batch if other QC is queued,
+            # otherwise goes straight through (the user is waiting)
+            response = await fleet.submit(
+                latency_budget_ms=60_000,
+                interactive=True,
                 messages=[{"role": "user", "content": prompt}],
+                system_prompt=QC_INSTRUCTIONS,
                 task_type="analysis",
                 complexity=TaskComplexity.MEDIUM,
                 max_tokens=300
             )
             
-            result = json.loads(response.content)
-            approved = result.get("approved", False)
-            issues = result.get("issues", [])
+            # Free-form reply (no schema, so it can be batched) - check the
+            # shape: only a real JSON true approves, issues become strings
+            result = json_loads(response.content)
+            approved = result.get("approved") is True
+            issues = [str(issue) for issue in result.get("issues") or []]
             
             if approved:
                 self.logger.info("✅ Final quality check PASSED!")
             else:
-                self.logger.warning(f"⚠️ Final quality check FAILED: {issues}")
+                self.logger.warning("⚠️ Final quality check FAILED: %s", issues)
+            
+            _qc_verdicts[verdict_key] = (approved, list(issues))
+            if len(_qc_verdicts) > QC_VERDICT_CACHE_SIZE:
+                _qc_verdicts.popitem(last=False)
             
             return approved, issues
         
         except Exception as e:
-            self.logger.error(f"Final check failed: {e}")
+            self.logger.error("Final check failed: %s", e)
             # Conservative: assume not ready if check fails
             return False, [f"Quality check error: {str(e)}"]
     
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas import UserCreate, UserResponse, UserLogin, Token
-from app.auth import create_user, authenticate_user, get_user_by_email
+from app.auth import create_user, authenticate_user, email_exists
 from app.core.security import create_access_token
 from app.dependencies import get_current_user
 from app.models import User
@@ -35,15 +36,16 @@ async def signup(
     - 400: Email already exists
     """
     # Check duplicate email
-    existing_user = get_user_by_email(db, user_data.email)
-    if existing_user:
+    if email_exists(db, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create user
-    new_user = create_user(db, user_data)
+    # Password hashing is deliberately slow CPU work, so it runs in the
+    # threadpool - other requests keep being served meanwhile
+    new_user = await run_in_threadpool(create_user, db, user_data)
     
     return new_user
 
@@ -68,7 +70,10 @@ async def login(
     - 200: Success, returns token
     - 401: Invalid credentials
     """
-    user = authenticate_user(db, login_data.email, login_data.password)
+    # Password check is slow CPU work - keep it off the event loop
+    user = await run_in_threadpool(
+        authenticate_user, db, login_data.email, login_data.password
+    )
     
     if not user:
         raise HTTPException(
@@ -15,25 +15,49 @@ Why we need this:
 - This converts web requests into agent function calls
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import asyncio
+import hashlib
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete
+from sqlalchemy.orm import Session, aliased
 from typing import List
 from uuid import UUID
-from app.database import get_db
-from app.models import User, Conversation
+from app.database import get_db, SessionLocal
+from app.models import User, Conversation, Project
 from app.schemas import MessageCreate, MessageResponse, ChatContextResponse
 from app.dependencies import get_current_user
-from app.agents.tilotma import Tilotma
+from app.agents.pool import evict, use_tilotma
+from app.agents.tilotma import ConversationPhase
 
 # Create router
 # A "router" is like a section of your restaurant's menu
 # This router handles all /api/chat/* URLs
 router = APIRouter()
 
+# Max messages deleted per transaction when clearing a chat
+CLEAR_BATCH_SIZE = 1000
+
+
+def _history_etag(messages, project_status) -> str:
+    """
+    Weak ETag for a chat history page.
+    
+    Hashes every returned message id (plus the project status), so adding,
+    deleting or paging past any message - not just the newest - changes it.
+    """
+    digest = hashlib.sha1()
+    for message in messages:
+        digest.update(str(message.id).encode())
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()}-{project_status}"'
+
 
 @router.post("/send", response_model=dict)
 async def send_message(
     message_data: MessageCreate,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -46,7 +70,7 @@ async def send_message(
     Step 1: User sends message (from React frontend)
     Step 2: This function receives it
     Step 3: We verify user is logged in (get_current_user does this)
-    Step 4: Create Tilotma agent instance
+    Step 4: Get this conversation's Tilotma (reused between messages)
     Step 5: Give message to Tilotma
     Step 6: Tilotma processes and responds
     Step 7: Send response back to user
@@ -79,17 +103,30 @@ async def send_message(
         "should_create_project": false,
         "cost": 0.03
     }
+    
+    Streaming (send header "Accept: text/event-stream"):
+    The reply arrives word by word as Server-Sent Events, so the user
+    sees Tilotma typing instead of a spinner:
+        data: {"delta": "That sounds "}
+        data: {"delta": "great!"}
+        data: {"done": true, "should_create_project": false, "cost": 0.03}
     """
     
-    # Create Tilotma agent
-    # Think of this as "calling Tilotma to the table"
-    # We give her the database connection, project ID (if exists), and user ID
-    tilotma = Tilotma(
-        db=db,
-        project_id=message_data.project_id,
-        user_id=current_user.id
-    )
+    # Streaming clients get the reply as it is generated
+    if 'text/event-stream' in request.headers.get('accept', ''):
+        return StreamingResponse(
+            _stream_reply(message_data, current_user.id),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache'}
+        )
     
+    # Get Tilotma agent
+    # Think of this as "calling Tilotma to the table"
+    # The same Tilotma stays at the table for the whole conversation
+    # (kept in a pool by project ID + user ID), so she remembers what
+    # was said without reloading it for every message. She takes one
+    # message at a time - a second request waits for the first.
+    #
     # Execute chat
     # This is where the magic happens - Tilotma thinks and responds
     # The execute() function:
@@ -99,9 +136,10 @@ async def send_message(
     # 4. Gets AI response
     # 5. Saves AI response to database
     # 6. Returns result
-    result = await tilotma.execute({
-        'message': message_data.content
-    })
+    async with use_tilotma(message_data.project_id, current_user.id) as tilotma:
+        result = await tilotma.execute({
+            'message': message_data.content
+        })
     
     # Return response to user
     return {
@@ -111,8 +149,68 @@ async def send_message(
     }
 
 
+async def _stream_reply(message_data: MessageCreate, user_id: UUID):
+    """
+    Relay Tilotma's streamed reply as Server-Sent Events.
+    
+    Each chunk is sent as {"delta": ...}. When the reply is complete,
+    both messages are saved to the database and a final {"done": true}
+    event carries the same fields as the JSON response.
+    
+    The conversation's Tilotma is held for the whole stream, so another
+    message for the same chat waits until this reply is finished.
+    """
+    
+    def event(payload: dict) -> str:
+        return f"data: {json.dumps(payload)}\n\n"
+    
+    async with use_tilotma(message_data.project_id, user_id) as tilotma:
+        try:
+            async for chunk in tilotma.chat_stream(message_data.content):
+                yield event({'delta': chunk})
+        except Exception as e:
+            yield event({'error': str(e)})
+            return
+        
+        reply = tilotma.context.messages[-1]
+        should_create_project = tilotma.context.phase == ConversationPhase.READY_FOR_SPEC
+    
+    # The request's DB session is closed once streaming starts,
+    # so the messages are saved with a session of our own
+    def save_messages():
+        with SessionLocal() as save_db:
+            save_db.add_all([
+                Conversation(
+                    user_id=user_id,
+                    project_id=message_data.project_id,
+                    agent_name='tilotma',
+                    role='user',
+                    content=message_data.content
+                ),
+                Conversation(
+                    user_id=user_id,
+                    project_id=message_data.project_id,
+                    agent_name='tilotma',
+                    role='assistant',
+                    content=reply.content,
+                    meta_info={'model': reply.model_used, 'cost': reply.cost}
+                )
+            ])
+            save_db.commit()
+    
+    await asyncio.to_thread(save_messages)
+    
+    yield event({
+        'done': True,
+        'should_create_project': should_create_project,
+        'cost': reply.cost
+    })
+
+
 @router.get("/history", response_model=ChatContextResponse)
 async def get_chat_history(
+    request: Request,
+    response: Response,
     project_id: UUID = None,
     limit: int = 50,
     current_user: User = Depends(get_current_user),
@@ -136,7 +234,7 @@ async def get_chat_history(
     
     Parameters:
     - project_id (optional): Which project's chat to fetch
-    - limit: Maximum number of messages to return (default 50)
+    - limit: Maximum number of messages to return, most recent kept (default 50)
     - current_user: Automatically injected (must be logged in)
     - db: Database connection
     
@@ -145,6 +243,11 @@ async def get_chat_history(
     - current_agent: Which agent user is talking to (always 'tilotma' for now)
     - project_status: If project exists, what stage it's in
     
+    Caching:
+    - Every response has an ETag header
+    - Send it back as If-None-Match; if nothing changed you get
+      304 Not Modified (empty body) and can keep showing your copy
+    
     Example request:
     GET /api/chat/history?project_id=123e4567-e89b-12d3-a456-426614174000&limit=20
     Headers: Authorization: Bearer <token>
@@ -185,24 +288,45 @@ async def get_chat_history(
         # Get pre-project chat (where project_id is null)
         query = query.filter(Conversation.project_id.is_(None))
     
-    # Sort by time (oldest first) and limit
-    messages = query.order_by(Conversation.created_at.asc()).limit(limit).all()
+    # Newest `limit` messages (read straight off the created_at DESC index),
+    # handed back oldest first by the outer query - no reversing in Python
+    def fetch_messages():
+        latest = query.order_by(Conversation.created_at.desc()).limit(limit).subquery()
+        message = aliased(Conversation, latest)
+        return db.query(message).order_by(message.created_at.asc()).all()
+    
+    # Fetch project status if project exists
+    # Uses its own session - a Session can't be shared between threads
+    def fetch_project_status():
+        with SessionLocal() as project_db:
+            project = project_db.query(Project.status).filter(
+                Project.id == project_id,
+                Project.user_id == current_user.id
+            ).first()
+            return project.status if project else None
     
     # Determine current status
     # (In v1, always 'tilotma' - later versions will route to different agents)
     current_agent = 'tilotma'
-    project_status = None
     
+    # Both queries are independent, so run them side by side in worker
+    # threads (waits for one DB round trip instead of two, and the event
+    # loop keeps serving other requests meanwhile)
     if project_id:
-        # Fetch project status if project exists
-        from app.models import Project
-        project = db.query(Project).filter(
-            Project.id == project_id,
-            Project.user_id == current_user.id
-        ).first()
-        
-        if project:
-            project_status = project.status
+        messages, project_status = await asyncio.gather(
+            asyncio.to_thread(fetch_messages),
+            asyncio.to_thread(fetch_project_status)
+        )
+    else:
+        messages = await asyncio.to_thread(fetch_messages)
+        project_status = None
+    
+    # Unchanged since the client's last fetch? Then skip sending it again.
+    # The tag changes whenever any message is added/removed or the status moves.
+    etag = _history_etag(messages, project_status)
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    response.headers['ETag'] = etag
     
     return {
         'messages': messages,
@@ -246,19 +370,25 @@ async def delete_message(
     Headers: Authorization: Bearer <token>
     """
     
-    # Find message
-    message = db.query(Conversation).filter(
-        Conversation.id == message_id,
-        Conversation.user_id == current_user.id  # Security: only own messages
+    # Delete it in one statement (no SELECT first, no ORM object loaded);
+    # RETURNING says which conversation it belonged to
+    deleted = db.execute(
+        delete(Conversation)
+        .where(
+            Conversation.id == message_id,
+            Conversation.user_id == current_user.id  # Security: only own messages
+        )
+        .returning(Conversation.project_id)
     ).first()
     
-    if not message:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Message not found")
     
-    # Delete it
-    db.delete(message)
     db.commit()
     
+    # The live Tilotma still remembers the message - start her afresh
+    await evict(deleted.project_id, current_user.id)
+    
     return None  # 204 response has no body
 
 
@@ -302,6 +432,10 @@ async def clear_chat_history(
     Body: {"project_id": null}
     """
     
+    # Drop the live Tilotma first (she finishes saving her pending
+    # messages), so she can't answer from the cleared context
+    await evict(project_id, current_user.id)
+    
     # Build delete query
     query = db.query(Conversation).filter(
         Conversation.user_id == current_user.id,
@@ -313,8 +447,20 @@ async def clear_chat_history(
     else:
         query = query.filter(Conversation.project_id.is_(None))
     
-    # Delete all matching messages
-    query.delete(synchronize_session=False)
-    db.commit()
+    # Delete all matching messages, CLEAR_BATCH_SIZE rows per transaction
+    # Long histories would otherwise be one huge DELETE holding row locks
+    # (and blocking new messages) until it finishes. Runs in a worker
+    # thread so the server keeps answering other requests meanwhile.
+    def delete_in_batches():
+        batch_ids = query.with_entities(Conversation.id).limit(CLEAR_BATCH_SIZE).scalar_subquery()
+        while True:
+            deleted = db.query(Conversation).filter(
+                Conversation.id.in_(batch_ids)
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted < CLEAR_BATCH_SIZE:
+                break
+    
+    await asyncio.to_thread(delete_in_batches)
     
     return None
\ No newline at end of file
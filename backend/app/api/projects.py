@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
@@ -6,9 +6,18 @@ from app.database import get_db
 from app.models import User, Project
 from app.schemas import ProjectCreate, ProjectResponse
 from app.dependencies import get_current_user
+from app.agents.pool import evict
 
 router = APIRouter()
 
+# Only the columns ProjectResponse needs - skips the large JSON columns
+# (tech_stack, requirements_specification) when listing
+PROJECT_RESPONSE_COLUMNS = (
+    Project.id, Project.user_id, Project.title, Project.description,
+    Project.status, Project.complexity_score, Project.quoted_price,
+    Project.current_agent, Project.created_at, Project.updated_at,
+)
+
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
@@ -46,19 +55,27 @@ async def create_project(
 
 @router.get("/", response_model=List[ProjectResponse])
 async def list_projects(
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get all projects for current user
+    Get current user's projects, newest first (paginated)
     
     Why filter by user_id?
     - Security: Users should only see their own projects
     - Multi-tenancy: Each user has isolated data
     
+    Pagination:
+    - limit: Projects per page (default 50, max 100)
+    - offset: How many to skip (e.g. offset=50 for page 2)
+    
     Returns empty list if user has no projects yet
     """
-    projects = db.query(Project).filter(Project.user_id == current_user.id).all()
+    projects = db.query(*PROJECT_RESPONSE_COLUMNS).filter(
+        Project.user_id == current_user.id
+    ).order_by(Project.created_at.desc()).limit(limit).offset(offset).all()
     return projects
 
 
@@ -107,15 +124,19 @@ async def delete_project(
     - Successful deletion returns nothing
     - Standard REST practice
     """
-    project = db.query(Project).filter(
+    # The project's live Tilotma goes first (after saving pending messages)
+    await evict(project_id, current_user.id)
+    
+    # One DELETE statement - no SELECT first, no ORM object loaded.
+    # Child rows go with it via the ON DELETE CASCADE foreign keys.
+    deleted = db.query(Project).filter(
         Project.id == project_id,
         Project.user_id == current_user.id
-    ).first()
+    ).delete(synchronize_session=False)
     
-    if not project:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    db.delete(project)
     db.commit()
     
     return None  # FastAPI converts this to 204
\ No newline at end of file
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from app.models import User
 from app.schemas import UserCreate, UserLogin
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import verify_password, get_password_hash, password_needs_rehash, create_access_token
 from typing import Optional
 from uuid import UUID
 
@@ -61,6 +61,11 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     if not verify_password(password, user.hashed_password):
         return None
     
+    # Upgrade old hashes (bcrypt, weaker Argon2 settings) while we have the password
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = get_password_hash(password)
+        db.commit()
+    
     return user
 
 
@@ -74,7 +79,20 @@ def get_user_by_id(db: Session, user_id: UUID) -> Optional[User]:
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """
-    Check if email already exists
+    Fetch user by email
+    (Only need to know if it's taken? Use email_exists - it's cheaper)
+    """
+    return db.query(User).filter(User.email == email).first()
+
+
+def email_exists(db: Session, email: str) -> bool:
+    """
+    Check if an account with this email exists (without loading it)
     Used by: Signup endpoint to prevent duplicate accounts
+    
+    Runs SELECT EXISTS(...) - answered from the unique index on
+    users.email, no user row is fetched or built
     """
-    return db.query(User).filter(User.email == email).first()
\ No newline at end of file
+    return db.query(
+        db.query(User.id).filter(User.email == email).exists()
+    ).scalar()
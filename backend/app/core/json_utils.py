@@ -0,0 +1,40 @@
+"""
+Shared JSON helpers for AI requests and replies.
+
+orjson parses and serializes several times faster than the stdlib json
+module; everything that handles provider bodies, structured replies or
+architecture prompts goes through these helpers.
+"""
+
+import re
+from typing import Any
+
+import orjson
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so existing
+# `except json.JSONDecodeError` handlers keep working
+json_loads = orjson.loads
+
+
+def json_body(data: Any) -> bytes:
+    """Serialize an HTTP request body"""
+    return orjson.dumps(data)
+
+
+def json_dumps_compact(data: Any) -> str:
+    """Compact JSON for prompts (indentation only costs input tokens)"""
+    return orjson.dumps(data).decode()
+
+
+def json_dumps_indented(data: Any) -> str:
+    """Two-space indented JSON (config files, readable prompt sections)"""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Fallbacks for replies that aren't bare JSON: a ```json / ``` fenced
+# block, else the outermost {...}
+FENCED_JSON_RE = re.compile(r'```(?:json)?\n(.*?)\n```', re.DOTALL)
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Leading ```json / ``` and trailing ``` markdown fences around a JSON reply
+FENCE_RE = re.compile(r"\A\s*```(?:json)?|```\s*\Z")
@@ -1,4 +1,6 @@
 ﻿import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from typing import Optional
@@ -9,20 +11,36 @@ SECRET_KEY = os.getenv('JWT_SECRET', 'dev-secret-key-change-in-production')
 ALGORITHM = 'HS256'
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Password hashing: Argon2id (64 MiB, 2 passes, 4 lanes hashed in parallel)
+# Older bcrypt hashes still verify and are upgraded on the next login
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=4, hash_len=32)
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    '''Verify password against hash'''
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
+    '''Verify password against hash (Argon2id, or legacy bcrypt)'''
+    if hashed_password.startswith(BCRYPT_PREFIXES):
+        return bcrypt.checkpw(
+            plain_password.encode('utf-8'),
+            hashed_password.encode('utf-8')
+        )
+    
+    try:
+        return password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
 
 
 def get_password_hash(password: str) -> str:
-    '''Hash password using bcrypt'''
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    '''Hash password using Argon2id'''
+    return password_hasher.hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    '''True for bcrypt hashes or Argon2 hashes made with older parameters'''
+    if hashed_password.startswith(BCRYPT_PREFIXES):
+        return True
+    return password_hasher.check_needs_rehash(hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
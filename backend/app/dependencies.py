@@ -5,7 +5,9 @@ from app.database import get_db
 from app.models import User
 from app.core.security import decode_access_token
 from app.auth import get_user_by_id
+from typing import Dict, Tuple
 from uuid import UUID
+import time
 
 # OAuth2PasswordBearer tells FastAPI:
 # - Tokens come from Authorization header
@@ -13,6 +15,38 @@ from uuid import UUID
 # - Automatically adds /docs login UI
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+# Recently validated tokens -> (user_id, is_active, expires at on time.monotonic())
+# Active chat sessions send many requests a minute; this skips the token
+# decode + signature check for repeats. Only the id and active flag are
+# kept - every request still loads its own User row (so no two requests
+# share an object, and a deleted or deactivated user is refused at once).
+# Per worker process; call invalidate_user() when a user changes.
+USER_CACHE_TTL_SECONDS = 60
+USER_CACHE_MAX_SIZE = 10_000
+_user_cache: Dict[str, Tuple[UUID, bool, float]] = {}
+
+
+def invalidate_user(user_id: UUID):
+    """Forget every cached token of a user (profile change, deactivation, deletion)"""
+    for token in [token for token, (cached_id, _, _) in _user_cache.items() if cached_id == user_id]:
+        del _user_cache[token]
+
+
+def _cache_user(token: str, user: User, token_expiry: float):
+    """Remember a validated token (never past the token's own expiry)"""
+    ttl = min(USER_CACHE_TTL_SECONDS, token_expiry - time.time())
+    if ttl <= 0:
+        return
+    
+    now = time.monotonic()
+    if len(_user_cache) >= USER_CACHE_MAX_SIZE:
+        for key in [key for key, (_, _, expires) in _user_cache.items() if expires <= now]:
+            del _user_cache[key]
+        while len(_user_cache) >= USER_CACHE_MAX_SIZE:
+            del _user_cache[next(iter(_user_cache))]  # Oldest first
+    
+    _user_cache[token] = (user.id, user.is_active, now + ttl)
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -45,29 +79,43 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    inactive_exception = HTTPException(status_code=400, detail="Inactive user")
     
-    # Decode token
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    # Extract user_id from token
-    user_id_str: str = payload.get("sub")
-    if user_id_str is None:
-        raise credentials_exception
-    
-    # Get user from database
-    try:
-        user_id = UUID(user_id_str)
-    except ValueError:
-        raise credentials_exception
+    cached = _user_cache.get(token)
+    if cached is not None and cached[2] > time.monotonic():
+        user_id, is_active, _ = cached
+        if not is_active:
+            raise inactive_exception
+        payload = None
+    else:
+        # Decode token
+        payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception
+        
+        # Extract user_id from token
+        user_id_str: str = payload.get("sub")
+        if user_id_str is None:
+            raise credentials_exception
+        
+        try:
+            user_id = UUID(user_id_str)
+        except ValueError:
+            raise credentials_exception
     
+    # Get user from database (this request's own copy)
     user = get_user_by_id(db, user_id)
     if user is None:
+        invalidate_user(user_id)
         raise credentials_exception
     
+    if payload is not None:
+        _cache_user(token, user, payload.get("exp", 0))
+    elif not user.is_active:
+        invalidate_user(user_id)  # Deactivated since it was cached
+    
     if not user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
+        raise inactive_exception
     
     return user
 
@@ -16,6 +16,7 @@ This file is what actually runs.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import auth, projects, chat  # IMPORTANT: Added 'chat' here
+from app.services.ai_router import ai_router
 import os
 from dotenv import load_dotenv
 
@@ -155,7 +156,7 @@ async def startup_event():
     """
     Things to do when application starts
     
-    Current: Just print status messages
+    Current: Print status messages, open the shared HTTP client
     Future possibilities:
     - Initialize database connection pool
     - Warm up AI model caches
@@ -171,6 +172,11 @@ async def startup_event():
     print(f"🤖 Anthropic API: {'Configured' if os.getenv('ANTHROPIC_API_KEY') else 'Not configured'}")
     print(f"🤖 Google API: {'Configured' if os.getenv('GOOGLE_API_KEY') else 'Not configured'}")
     print("=" * 60)
+    
+    # Open the shared HTTP client on the serving loop, so the first
+    # request doesn't pay for building it
+    await ai_router.get_http_client()
+    
     print("✅ Server Ready!")
     print("📚 API Documentation: http://localhost:8000/docs")
     print("💬 Chat Endpoint: http://localhost:8000/api/chat/send")
@@ -185,7 +191,7 @@ async def shutdown_event():
     """
     Cleanup when application shuts down
     
-    Current: Just print message
+    Current: Print message, close pooled AI provider connections
     Future possibilities:
     - Close database connections
     - Finish pending tasks
@@ -195,6 +201,9 @@ async def shutdown_event():
     print("\n" + "=" * 60)
     print("👋 NexSidi API Shutting Down...")
     print("=" * 60)
+    
+    # Close pooled AI provider connections
+    await ai_router.close()
 
 
 # Development Server
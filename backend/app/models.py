@@ -1,4 +1,4 @@
-﻿from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, JSON
+﻿from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from app.database import Base
@@ -46,6 +46,11 @@ class Project(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Project list (GET /api/projects): newest first, one page at a time
+    __table_args__ = (
+        Index('idx_projects_user_created', user_id, created_at.desc()),
+    )
 
 # Table 3: Conversations (chat history with agents)
 class Conversation(Base):
@@ -65,6 +70,22 @@ class Conversation(Base):
     meta_info = Column(JSON)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Chat history lookups (GET /api/chat/history): rows come back already
+    # in created_at order from the index, no scan + sort
+    __table_args__ = (
+        Index(
+            'idx_conv_user_project_created',
+            user_id, project_id, created_at.desc(),
+            postgresql_where=(agent_name == 'tilotma')
+        ),
+        # Pre-project chat (project_id IS NULL)
+        Index(
+            'idx_conv_user_noproject',
+            user_id, created_at.desc(),
+            postgresql_where=(agent_name == 'tilotma') & project_id.is_(None)
+        ),
+    )
 
 # Table 4: Change Requests (iteration tracking - 5 mid + 11 small allowed)
 class ChangeRequest(Base):
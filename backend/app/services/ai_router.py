@@ -20,17 +20,34 @@ import logging
 import httpx
 import json
 import hashlib
+import heapq
+import math
+import random
+import re
+import weakref
+from collections import Counter, OrderedDict, deque
 
 # Typing & Data structures
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator
 from dataclasses import dataclass
+from functools import lru_cache, partial
 from enum import Enum
 
+from app.services.llm_cache import llm_cache
+from app.core.json_utils import json_body, json_loads
+
 # Google Auth (The complete set)
 import google.auth
 import google.auth.transport.requests  # For refreshing tokens
 from google.oauth2 import service_account  # For loading key files (from Block 1)
 
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -47,9 +64,9 @@ class TaskComplexity(Enum):
     MOST_COMPLEX = "most_complex"  # Requirements analysis, critical decisions
 
 
-@dataclass
+@dataclass(slots=True)
 class AIResponse:
-    """Standardized response from any AI provider"""
+    """Standardized response from any AI provider (slotted - one per call)"""
     content: str
     model_id: str
     input_tokens: int
@@ -63,6 +80,22 @@ class AIResponse:
     escalation_count: int = 0
 
 
+class AIStream:
+    """
+    Handle for a streaming generation.
+    
+    Iterate it to receive text chunks as they arrive. Once exhausted,
+    `response` holds the complete AIResponse (content, tokens, cost).
+    """
+    
+    def __init__(self):
+        self.response: Optional[AIResponse] = None
+        self._chunks: Optional[AsyncIterator[str]] = None
+    
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._chunks
+
+
 # =============================================================================
 # MODEL CONFIGURATIONS
 # =============================================================================
@@ -121,6 +154,15 @@ GEMINI_VERTEX_MODELS = {
     },
 }
 
+# Provider of every known model, built once (one dict lookup per dispatch)
+MODEL_PROVIDERS = {
+    **{model: "claude" for model in CLAUDE_MODELS},
+    **{model: "vertex" for model in GEMINI_VERTEX_MODELS},
+}
+
+ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
+ANTHROPIC_VERSION = "2023-06-01"
+
 # =============================================================================
 # MODEL SELECTION LOGIC
 # =============================================================================
@@ -213,6 +255,239 @@ ESCALATION_CHAINS = {
     "claude-opus-4.5": [],  # Largest model, nowhere to escalate
 }
 
+# =============================================================================
+# SEMANTIC CACHE
+# =============================================================================
+
+_WORD_RE = re.compile(r"\w+")
+_LITERAL_RE = re.compile(r"\d+(?:[.,]\d+)*|\b(?:no|not|never|without|none|nor|\w+n't)\b")
+
+
+class SemanticCache:
+    """
+    Near-duplicate prompt cache.
+    
+    Prompts are compared as word + bigram count vectors using cosine
+    similarity, so rephrasings that only differ in casing, punctuation
+    or a stray word hit the cache without needing an embedding model.
+    Entries are scoped (task type, complexity, preceding messages) so a
+    greeting can never answer a readiness check. Numbers and negations
+    are part of the scope too: "budget 50000" and "budget 90000", or
+    "an admin panel" and "no admin panel", score ~0.98 but must miss.
+    
+    Features are stored as hashed int ids, and each entry also keeps a
+    1024-bit binary signature. Lookups rank entries by signature overlap
+    (one AND + popcount each) and only compute the exact cosine for the
+    best few candidates.
+    """
+    
+    SIGNATURE_BITS = 1024
+    RERANK_TOP_K = 4
+    
+    def __init__(self, threshold: float = 0.97, ttl: float = 3600, max_entries: int = 256):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, deque] = {}
+    
+    @classmethod
+    def _vectorize(cls, text: str) -> Tuple[Dict[int, int], float, int]:
+        """Build a hashed word + bigram count vector, its norm and binary signature"""
+        words = _WORD_RE.findall(text.lower())
+        vector = Counter(map(hash, words))
+        vector.update(map(hash, zip(words, words[1:])))
+        norm = math.sqrt(sum(count * count for count in vector.values()))
+        
+        signature = 0
+        for feature in vector:
+            signature |= 1 << (feature % cls.SIGNATURE_BITS)
+        
+        return dict(vector), norm, signature
+    
+    @staticmethod
+    def _literal_scope(scope: str, text: str) -> str:
+        """Append the prompt's numbers and negations, which must match exactly"""
+        literals = _LITERAL_RE.findall(text.lower())
+        return f"{scope}|{' '.join(literals)}" if literals else scope
+    
+    def get(self, scope: str, text: str) -> Optional[AIResponse]:
+        """Return the cached response of the most similar prompt, if close enough"""
+        entries = self._entries.get(self._literal_scope(scope, text))
+        if not entries:
+            return None
+        
+        vector, norm, signature = self._vectorize(text)
+        if not norm:
+            return None
+        
+        # Coarse pass on binary signatures
+        cutoff = time.time() - self.ttl
+        bits = signature.bit_count()
+        candidates = heapq.nlargest(
+            self.RERANK_TOP_K,
+            (entry for entry in reversed(entries) if entry[5] >= cutoff),  # newest wins ties
+            key=lambda entry: (signature & entry[2]).bit_count() / math.sqrt(bits * entry[3])
+        )
+        
+        # Exact cosine on the survivors
+        best_score, best_response = 0.0, None
+        for cached_vector, cached_norm, _, _, response, _ in candidates:
+            small, large = sorted((vector, cached_vector), key=len)
+            dot = sum(count * large.get(feature, 0) for feature, count in small.items())
+            score = dot / (norm * cached_norm)
+            if score > best_score:
+                best_score, best_response = score, response
+        
+        return best_response if best_score >= self.threshold else None
+    
+    def put(self, scope: str, text: str, response: AIResponse):
+        """Store a response for later near-duplicate lookups"""
+        vector, norm, signature = self._vectorize(text)
+        if not norm:
+            return
+        
+        entries = self._entries.setdefault(
+            self._literal_scope(scope, text), deque(maxlen=self.max_entries)
+        )
+        entries.append((vector, norm, signature, signature.bit_count(), response, time.time()))
+
+
+# =============================================================================
+# CONCURRENCY LIMITS
+# =============================================================================
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` requests per `period` seconds.
+    
+    Bursts up to `rate` are allowed; after that callers wait for tokens
+    to refill instead of hitting the provider and getting a 429.
+    """
+    
+    def __init__(self, rate: int, period: float = 60.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+    
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate,
+                self._tokens + (now - self._updated) * self.rate / self.period
+            )
+            self._updated = now
+            
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            
+            await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open"""
+
+
+class ProviderError(Exception):
+    """Provider-side failure (5xx) - counts against the provider's breaker"""
+
+
+class QuotaExceededError(ProviderError):
+    """Provider refused the call for rate limit / overload (429, 529)"""
+    
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after  # Seconds the provider asked us to wait
+
+
+QUOTA_STATUS_CODES = frozenset({429, 529})
+
+# Error types of Claude stream "error" events
+_CLAUDE_STREAM_ERRORS = {
+    "rate_limit_error": QuotaExceededError,
+    "overloaded_error": QuotaExceededError,
+    "api_error": ProviderError,
+}
+
+
+def _api_error(provider: str, response: httpx.Response) -> Exception:
+    """Error for a non-200 provider response, typed by status code"""
+    message = f"{provider} error: {response.status_code} - {response.text}"
+    
+    if response.status_code in QUOTA_STATUS_CODES:
+        try:
+            retry_after = float(response.headers.get("retry-after", 0))
+        except ValueError:
+            retry_after = 0.0  # HTTP-date form - fall back to our own backoff
+        return QuotaExceededError(message, retry_after)
+    
+    if response.status_code >= 500:
+        return ProviderError(message)
+    
+    return Exception(message)  # Our request was bad - don't blame the provider
+
+
+class CircuitBreaker:
+    """
+    Stops calling a provider that keeps failing.
+    
+    - closed: calls go through; failures within `window` seconds are counted
+    - open: after `threshold` of them, calls are rejected without any I/O
+    - half_open: once `cooldown` seconds have passed, one probe call goes
+      through; success closes the breaker, failure re-opens it
+    """
+    
+    def __init__(self, threshold: int = 5, window: float = 60.0, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self._failures: deque = deque()
+        self._opened_at: Optional[float] = None
+    
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+    
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the probe when half open)"""
+        state = self.state
+        if state == "half_open":
+            self._opened_at = time.monotonic()  # One probe per cooldown
+            return True
+        return state == "closed"
+    
+    def record_success(self):
+        self._failures.clear()
+        self._opened_at = None
+    
+    def record_failure(self):
+        now = time.monotonic()
+        if self._opened_at is not None:
+            self._opened_at = now  # Failed probe - stay open another cooldown
+            return
+        
+        self._failures.append(now)
+        while now - self._failures[0] > self.window:
+            self._failures.popleft()
+        if len(self._failures) >= self.threshold:
+            self._opened_at = now
+
+
+
 # =============================================================================
 # AI ROUTER CLASS
 # =============================================================================
@@ -233,7 +508,10 @@ class AIRouter:
         """Initialize AI Router with credentials and HTTP client"""
         
         self.logger = logging.getLogger("ai.router")
-        self._http_client: Optional[httpx.AsyncClient] = None
+        # One HTTP client per event loop (a client can't be shared across loops)
+        self._http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
         
         # Load credentials
         self.anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -244,12 +522,25 @@ class AIRouter:
         self.has_claude = bool(self.anthropic_api_key)
         self.has_vertex = bool(self.gcp_project_id and self.gcp_credentials_path)
         
+        # Request headers are the same for every call - build them once
+        # (Vertex headers are rebuilt with each token refresh)
+        self._anthropic_headers = {
+            "x-api-key": self.anthropic_api_key,
+            "anthropic-version": ANTHROPIC_VERSION,
+            "content-type": "application/json",
+        }
+        self._vertex_headers: Dict[str, str] = {}
+        
         # Initialize GCP credentials for Vertex AI (REST API)
         self.gcp_token = None
         self.gcp_token_expiry = 0
         if self.has_vertex:
             self._refresh_gcp_token()
         
+        # Models callable with the configured providers (rebuilt only when
+        # provider availability changes, e.g. a failed GCP token refresh)
+        self._update_available_models()
+        
         # Log available providers
         providers = []
         if self.has_claude:
@@ -265,6 +556,46 @@ class AIRouter:
         # Request deduplication cache (in-memory)
         self._request_cache = {}
         self._cache_ttl = 60  # Cache for 60 seconds
+        
+        # Near-duplicate prompt cache (opt-in per call)
+        self._semantic_cache = SemanticCache()
+        
+        # One breaker per provider - a dead provider fails fast
+        self._breakers = {provider: CircuitBreaker() for provider in ("claude", "vertex")}
+        
+        # Per-model Vertex setup, built on first use instead of per request:
+        # REST URLs by (model, method), converted schemas by schema object
+        self._vertex_urls: Dict[Tuple[str, str], str] = {}
+        self._gemini_schemas: "OrderedDict[int, Tuple[Dict[str, Any], Dict[str, Any]]]" = OrderedDict()
+        
+        # Bound in-flight requests and requests/minute across all agents
+        self.configure_limits(
+            max_concurrency=int(os.getenv("AI_MAX_CONCURRENCY", "10")),
+            rate_limit=int(os.getenv("AI_RATE_LIMIT_RPM", "120"))
+        )
+    
+    def configure_limits(
+        self,
+        max_concurrency: Optional[int] = None,
+        rate_limit: Optional[int] = None
+    ):
+        """
+        Set the concurrency ceiling and rate limit for provider calls.
+        
+        Args:
+            max_concurrency: Max simultaneous provider requests
+            rate_limit: Max provider requests per minute
+        """
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+            # One semaphore per event loop, like the HTTP clients: an asyncio
+            # semaphore binds to the first loop that waits on it
+            self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+                weakref.WeakKeyDictionary()
+            )
+        if rate_limit is not None:
+            self.rate_limit = rate_limit
+            self._rate_limiter = RateLimiter(rate_limit, 60.0)
     
     def _refresh_gcp_token(self):
         """Refresh GCP access token for Vertex AI REST API"""
@@ -283,37 +614,163 @@ class AIRouter:
             credentials.refresh(auth_req)
             
             self.gcp_token = credentials.token
+            self._vertex_headers = {
+                "Authorization": f"Bearer {self.gcp_token}",
+                "Content-Type": "application/json"
+            }
             self.gcp_token_expiry = time.time() + 3600  # Token valid for 1 hour
             
             self.logger.info("✅ GCP token refreshed")
         except Exception as e:
             self.logger.error(f"❌ Failed to refresh GCP token: {e}")
             self.has_vertex = False
+            self._update_available_models()
+    
+    async def _ensure_gcp_token(self):
+        """
+        Refresh the GCP token if it has expired.
+        
+        The refresh reads the key file and does a blocking token exchange,
+        so it runs in a worker thread instead of stalling the event loop.
+        """
+        if time.time() >= self.gcp_token_expiry:
+            await asyncio.to_thread(self._refresh_gcp_token)
     
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client with retries"""
-        if self._http_client is None or self._http_client.is_closed:
-            transport = httpx.AsyncHTTPTransport(retries=3)
-            self._http_client = httpx.AsyncClient(
-                timeout=120.0,
-                transport=transport,
-                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
+        """
+        Get or create the HTTP client for the running event loop.
+        
+        Connections (and their TLS sessions) are reused across calls on
+        the same loop. Scripts and workers that run several loops get a
+        client each instead of one bound to a loop that has since closed.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._http_clients.get(loop)
+        
+        if client is None or client.is_closed:
+            # Limits belong on the transport (a client ignores them once a
+            # transport is passed). Providers close idle connections after
+            # about a minute; expire ours just before that instead of
+            # httpx's 5s, so a reused socket is rarely already closed.
+            transport = httpx.AsyncHTTPTransport(
+                retries=3,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_keepalive_connections=32,
+                    max_connections=128,
+                    keepalive_expiry=55.0
+                )
+            )
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(120.0, connect=10.0),
+                transport=transport
             )
-        return self._http_client
+            self._http_clients[loop] = client
+        
+        return client
+    
+    async def get_http_client(self) -> httpx.AsyncClient:
+        """
+        The app-wide pooled HTTP client for the running event loop.
+        
+        Agents, routes and services that make outbound HTTP calls should
+        use this instead of creating their own AsyncClient, so keep-alive
+        connections and TLS sessions are shared. Don't close it - the app
+        shutdown hook does (ai_router.close()).
+        
+        Example:
+            client = await ai_router.get_http_client()
+            response = await client.get(url)
+        """
+        return await self._get_client()
+    
+    @property
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit for the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+    
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        """
+        POST on the pooled client, retrying once on a stale connection.
+        
+        A provider edge can close an idle keep-alive socket just as we
+        reuse it. The pool drops the broken connection, so the single
+        retry goes out on a fresh (or another live) one.
+        """
+        client = await self._get_client()
+        try:
+            return await client.post(url, **kwargs)
+        except (httpx.RemoteProtocolError, httpx.ReadError) as e:
+            self.logger.warning(f"🔌 Stale connection to {httpx.URL(url).host} ({e!r}), retrying once")
+            return await client.post(url, **kwargs)
     
     async def close(self):
-        """Close HTTP client"""
-        if self._http_client:
-            await self._http_client.aclose()
+        """Close HTTP client of the running event loop"""
+        client = self._http_clients.pop(asyncio.get_running_loop(), None)
+        if client:
+            await client.aclose()
+    
+    def get_available_models(self) -> Dict[str, Tuple[str, ...]]:
+        """
+        Models usable right now, by provider.
+        
+        Returns:
+            {"claude": (...), "vertex": (...)} - empty tuple if not configured
+        """
+        return self._available_models
+    
+    def _update_available_models(self):
+        self._available_models = {
+            "claude": tuple(CLAUDE_MODELS) if self.has_claude else (),
+            "vertex": tuple(GEMINI_VERTEX_MODELS) if self.has_vertex else (),
+        }
+        self._available_providers = tuple(
+            provider for provider, models in self._available_models.items() if models
+        )
+    
+    def select_model(self, task_type: str, complexity: TaskComplexity) -> str:
+        """
+        Best model for the task among the configured providers.
+        
+        Same as get_model_for_task(), except that a model whose provider
+        isn't configured is swapped for the first usable model in its
+        escalation chain (e.g. Gemini → Claude Sonnet on a Claude-only setup).
+        """
+        return self._select_model(task_type, complexity, self._available_providers)
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _select_model(
+        task_type: str,
+        complexity: TaskComplexity,
+        providers: Tuple[str, ...]
+    ) -> str:
+        """Memoized by (task_type, complexity, configured providers)"""
+        model = AIRouter.get_model_for_task(task_type, complexity)
+        if MODEL_PROVIDERS[model] in providers:
+            return model
+        
+        return next(
+            (m for m in ESCALATION_CHAINS.get(model, []) if MODEL_PROVIDERS[m] in providers),
+            model  # Nothing usable - the call reports the missing provider
+        )
     
+    @staticmethod
+    @lru_cache(maxsize=None)
     def get_model_for_task(
-        self, 
         task_type: str, 
         complexity: TaskComplexity
     ) -> str:
         """
         Select best model for task based on type and complexity.
         
+        Depends only on its arguments and TASK_MODEL_MAPPING, so each
+        (task_type, complexity) pair is resolved once and then memoized.
+        
         Args:
             task_type: "chat", "architecture", "code_generation", "code_review", "deployment"
             complexity: TaskComplexity enum (SIMPLE, MEDIUM, COMPLEX, MOST_COMPLEX)
@@ -368,6 +825,9 @@ class AIRouter:
         max_tokens: Optional[int] = None,
         temperature: float = 0.7,
         auto_escalate: bool = True,
+        semantic_cache: bool = False,
+        response_schema: Optional[Dict[str, Any]] = None,
+        hedge_ms: Optional[int] = None,
     ) -> AIResponse:
         """
         Generate AI response with automatic model selection and escalation.
@@ -381,14 +841,27 @@ class AIRouter:
             max_tokens: Optional token limit (None = use model's full capacity)
             temperature: Randomness (0.0-1.0)
             auto_escalate: Automatically retry with larger model if truncated
+            semantic_cache: Reuse the response of a near-identical earlier
+                prompt (same task, complexity and preceding messages)
+            response_schema: Optional JSON schema; the provider's structured
+                output mode is used so content is always valid JSON
+            hedge_ms: For latency-critical calls - if the model hasn't answered
+                within this many ms, race it against its first fallback model
         
         Returns:
             AIResponse with content, tokens, cost, etc.
         
         Raises:
+            ValueError: If messages is empty or model is not a known model
             Exception: If all models fail or no providers available
         """
         
+        # Reject malformed requests before touching caches, limits or providers
+        if not messages:
+            raise ValueError("messages cannot be empty")
+        if model is not None and model not in MODEL_PROVIDERS:
+            raise ValueError(f"Unknown model: {model}")
+        
         start_time = time.time()
         
         # Check cache for duplicate requests
@@ -402,20 +875,48 @@ class AIRouter:
                 self.logger.info(f"♻️  Using cached response (hash: {request_hash[:8]})")
                 return cached["response"]
         
+        # Check near-duplicate cache (last message compared, the rest must match)
+        semantic_text = None
+        if semantic_cache and isinstance(messages[-1].get("content"), str):
+            semantic_text = messages[-1]["content"]
+            semantic_scope = (
+                f"{complexity.value}:{model}:{max_tokens}:"
+                f"{self._generate_request_hash(messages[:-1], system_prompt, task_type)}"
+            )
+            cached_response = self._semantic_cache.get(semantic_scope, semantic_text)
+            if cached_response is not None:
+                self.logger.info(f"♻️  Using semantically cached response ({task_type})")
+                return cached_response
+        
         # Select model if not specified
         if model is None:
-            model = self.get_model_for_task(task_type, complexity)
+            model = self.select_model(task_type, complexity)
+        
+        model = self._route_around_open_breaker(model)
         
         self.logger.info(f"🤖 Task: {task_type}/{complexity.value} → Model: {model}")
         
+        # Check persistent response cache (opt-in, NEXSIDI_LLM_CACHE=1)
+        disk_key = None
+        if llm_cache.enabled:
+            disk_key = llm_cache.key(
+                model, messages, system_prompt, max_tokens, temperature, response_schema
+            )
+            cached = await llm_cache.get(disk_key)
+            if cached is not None:
+                self.logger.info(f"♻️  Using disk-cached response (key: {disk_key[:8]})")
+                return AIResponse(**{**cached, "latency_ms": 0.0})
+        
         # Try primary model
         try:
-            response = await self._call_model(
+            call = self._call_model if hedge_ms is None else partial(self._call_hedged, hedge_ms=hedge_ms)
+            response = await call(
                 model=model,
                 messages=messages,
                 system_prompt=system_prompt,
                 max_tokens=max_tokens,
-                temperature=temperature
+                temperature=temperature,
+                response_schema=response_schema
             )
             
             response.latency_ms = (time.time() - start_time) * 1000
@@ -428,7 +929,8 @@ class AIRouter:
                     messages=messages,
                     system_prompt=system_prompt,
                     temperature=temperature,
-                    original_response=response
+                    original_response=response,
+                    response_schema=response_schema
                 )
             
             self.logger.info(
@@ -441,6 +943,10 @@ class AIRouter:
                 "response": response,
                 "timestamp": time.time()
             }
+            if semantic_text is not None:
+                self._semantic_cache.put(semantic_scope, semantic_text, response)
+            if disk_key is not None:
+                await llm_cache.set(disk_key, response, ttl=3600)
             
             # Clean old cache entries (keep cache size manageable)
             if len(self._request_cache) > 100:
@@ -463,7 +969,8 @@ class AIRouter:
         messages: List[Dict[str, str]],
         system_prompt: Optional[str],
         temperature: float,
-        original_response: AIResponse
+        original_response: AIResponse,
+        response_schema: Optional[Dict[str, Any]] = None
     ) -> AIResponse:
         """
         Escalate to larger model when truncated.
@@ -488,7 +995,8 @@ class AIRouter:
                     messages=messages,
                     system_prompt=system_prompt,
                     max_tokens=None,  # Use model's full capacity
-                    temperature=temperature
+                    temperature=temperature,
+                    response_schema=response_schema
                 )
                 
                 # Check if complete
@@ -508,14 +1016,294 @@ class AIRouter:
         # All escalations failed
         self.logger.error("❌ All escalation attempts failed")
         raise Exception("Code too large for all available models - need to split file")
+
+    async def _cancel_batch(self, batch_id: str):
+        """Ask Anthropic to stop processing a batch (best effort)"""
+        client = await self._get_client()
+        try:
+            response = await client.post(
+                f"{ANTHROPIC_URL}/batches/{batch_id}/cancel",
+                headers=self._anthropic_headers
+            )
+            if response.status_code != 200:
+                self.logger.warning(f"⚠️ Could not cancel batch {batch_id}: {response.status_code} - {response.text}")
+            else:
+                self.logger.info(f"🛑 Cancelled batch {batch_id}")
+        except httpx.HTTPError as e:
+            self.logger.warning(f"⚠️ Could not cancel batch {batch_id}: {e}")
+
+    async def generate_batch(
+        self,
+        requests: List[Dict[str, Any]],
+        poll_interval: float = 30.0,
+        timeout: float = 3600.0
+    ) -> List[AIResponse]:
+        """
+        Run several generations through the Anthropic Message Batches API.
+
+        Batched requests are billed at half price but may take minutes to
+        complete, so this is only for work that can tolerate the latency
+        (background reviews, CI). No escalation or caching is applied.
+
+        Args:
+            requests: One dict per generation with the keys accepted by
+                generate() ("messages", "task_type", "complexity",
+                "system_prompt", "max_tokens", "temperature")
+            poll_interval: Seconds between status checks
+            timeout: Give up (and cancel the batch) after this many seconds
+
+        Returns:
+            AIResponse list in the same order as requests
+
+        Raises:
+            Exception: If a request maps to a non-Claude model, the batch
+                fails or times out, or any single request errors
+        """
+
+        if not self.has_claude:
+            raise Exception("Claude API not configured")
+
+        start_time = time.time()
+        headers = self._anthropic_headers
+
+        # Build one batch entry per request
+        batch_requests = []
+        model_configs = []
+        for index, request in enumerate(requests):
+            model = request.get("model") or self.select_model(
+                request.get("task_type", "code_generation"),
+                request.get("complexity", TaskComplexity.MEDIUM)
+            )
+            model_config = CLAUDE_MODELS.get(model)
+            if not model_config:
+                raise Exception(f"Batch mode only supports Claude models, got: {model}")
+
+            params = {
+                "model": model_config["id"],
+                "max_tokens": request.get("max_tokens") or model_config["max_output_tokens"],
+                "temperature": request.get("temperature", 0.7),
+                "messages": request["messages"],
+            }
+            if request.get("system_prompt"):
+                params["system"] = self._claude_system(request["system_prompt"])
+
+            batch_requests.append({"custom_id": f"req-{index}", "params": params})
+            model_configs.append(model_config)
+
+        # Submit batch
+        client = await self._get_client()
+        response = await client.post(
+            f"{ANTHROPIC_URL}/batches",
+            headers=headers,
+            content=json_body({"requests": batch_requests})
+        )
+        if response.status_code != 200:
+            raise Exception(f"Claude batch error: {response.status_code} - {response.text}")
+
+        batch = json_loads(response.content)
+        self.logger.info(f"📦 Submitted batch {batch['id']} ({len(batch_requests)} requests)")
+
+        # Poll until processing has ended
+        while batch.get("processing_status") != "ended":
+            if time.time() - start_time > timeout:
+                # Don't leave it running (and billed) once nobody is waiting
+                await self._cancel_batch(batch["id"])
+                raise Exception(f"Claude batch {batch['id']} timed out after {timeout:.0f}s")
+
+            await asyncio.sleep(poll_interval)
+            response = await client.get(
+                f"{ANTHROPIC_URL}/batches/{batch['id']}",
+                headers=headers
+            )
+            if response.status_code != 200:
+                raise Exception(f"Claude batch error: {response.status_code} - {response.text}")
+            batch = json_loads(response.content)
+
+        # Fetch results (JSONL, one line per request, in any order)
+        response = await client.get(batch["results_url"], headers=headers)
+        if response.status_code != 200:
+            raise Exception(f"Claude batch error: {response.status_code} - {response.text}")
+
+        results = {}
+        for line in response.text.splitlines():
+            if line.strip():
+                entry = json_loads(line)
+                results[entry["custom_id"]] = entry["result"]
+
+        latency_ms = (time.time() - start_time) * 1000
+        responses = []
+        for index, model_config in enumerate(model_configs):
+            result = results.get(f"req-{index}", {})
+            if result.get("type") != "succeeded":
+                raise Exception(f"Claude batch request req-{index} failed: {result}")
+
+            data = result["message"]
+            content = "".join(
+                block.get("text", "")
+                for block in data.get("content", [])
+                if block.get("type") == "text"
+            )
+            usage = data.get("usage", {})
+            input_tokens, billable_input = self._claude_input_tokens(usage)
+            output_tokens = usage.get("output_tokens", 0)
+
+            # Batch pricing is 50% of the standard rate
+            cost = 0.5 * (
+                (billable_input / 1000) * model_config["cost_per_1k_input"] +
+                (output_tokens / 1000) * model_config["cost_per_1k_output"]
+            )
+
+            responses.append(AIResponse(
+                content=content,
+                model_id=model_config["id"],
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                total_tokens=input_tokens + output_tokens,
+                finish_reason=data.get("stop_reason", "stop"),
+                latency_ms=latency_ms,
+                cost_estimate=cost,
+                provider="claude"
+            ))
+
+        self.logger.info(f"✅ Batch {batch['id']} complete in {latency_ms:.0f}ms")
+
+        return responses
+
+    def stream_generate(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str] = None,
+        task_type: str = "chat",
+        complexity: TaskComplexity = TaskComplexity.SIMPLE,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+    ) -> AIStream:
+        """
+        Generate AI response as a stream of text chunks.
+        
+        Meant for user-facing chat where time-to-first-token matters.
+        No caching, retries or escalation - a truncated stream stays
+        truncated (check stream.response.finish_reason).
+        
+        Example:
+            stream = ai_router.stream_generate(messages, task_type="chat")
+            async for chunk in stream:
+                print(chunk, end="")
+            print(stream.response.cost_estimate)
+        
+        Returns:
+            AIStream to iterate over
+        """
+        
+        # Select model if not specified
+        if model is None:
+            model = self.select_model(task_type, complexity)
+        
+        # Switching models is only safe before the first chunk goes out
+        model = self._route_around_open_breaker(model)
+        
+        self.logger.info(f"🤖 Task: {task_type}/{complexity.value} → Model: {model} (streaming)")
+        
+        stream = AIStream()
+        stream._chunks = self._stream_model(
+            stream, model, messages, system_prompt, max_tokens, temperature
+        )
+        return stream
     
-    async def _call_model(
+    async def _stream_model(
         self,
+        stream: AIStream,
         model: str,
         messages: List[Dict[str, str]],
         system_prompt: Optional[str],
         max_tokens: Optional[int],
         temperature: float
+    ) -> AsyncIterator[str]:
+        """Dispatch a streaming call to the right provider"""
+        
+        start_time = time.time()
+        provider = MODEL_PROVIDERS.get(model)
+        
+        if provider == "claude":
+            if not self.has_claude:
+                raise Exception("Claude API not configured")
+            chunks = self._stream_claude(stream, model, messages, system_prompt, max_tokens, temperature)
+        
+        elif provider == "vertex":
+            if not self.has_vertex:
+                raise Exception("Vertex AI not configured")
+            chunks = self._stream_vertex(stream, model, messages, system_prompt, max_tokens, temperature)
+        
+        else:
+            raise Exception(f"Unknown model: {model}")
+        
+        breaker = self._breakers[provider]
+        if not breaker.allow():
+            raise CircuitOpenError(f"{provider} circuit open, not calling {model}")
+        
+        try:
+            async with self._semaphore, self._rate_limiter:
+                async for chunk in chunks:
+                    yield chunk
+        except Exception as e:
+            if self._is_provider_failure(e):
+                breaker.record_failure()
+            raise
+        
+        breaker.record_success()
+        stream.response.latency_ms = (time.time() - start_time) * 1000
+        
+        self.logger.info(
+            f"✅ Streamed: {stream.response.output_tokens} tokens, "
+            f"{stream.response.latency_ms:.0f}ms, ₹{stream.response.cost_estimate:.2f}"
+        )
+    
+    async def _call_hedged(self, model: str, hedge_ms: int, **kwargs) -> AIResponse:
+        """
+        Call a model, hedging with its first available fallback.
+        
+        The fallback only starts once the primary has failed or is still
+        running after hedge_ms; whichever succeeds first wins and the other
+        call is cancelled. Fallbacks behind an open breaker are skipped.
+        """
+        
+        fallback = next(
+            (m for m in ESCALATION_CHAINS.get(model, []) if self._provider_available(m)),
+            None
+        )
+        if fallback is None:
+            return await self._call_model(model=model, **kwargs)
+        
+        primary = asyncio.ensure_future(self._call_model(model=model, **kwargs))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_ms / 1000)
+            if done and primary.exception() is None:
+                return primary.result()
+            
+            self.logger.warning(f"⏱️  {model} not done after {hedge_ms}ms, hedging with {fallback}")
+            pending.add(asyncio.ensure_future(self._call_model(model=fallback, **kwargs)))
+            
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            
+            return primary.result()  # Both failed - surface the primary's error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _call_model(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str],
+        max_tokens: Optional[int],
+        temperature: float,
+        response_schema: Optional[Dict[str, Any]] = None
     ) -> AIResponse:
         """
         Call specific model with automatic retry on rate limits.
@@ -531,59 +1319,136 @@ class AIRouter:
         for attempt in range(max_retries):
             try:
                 # Determine provider and call appropriate API
-                if model.startswith("claude-"):
-                    if not self.has_claude:
-                        raise Exception("Claude API not configured")
-                    return await self._call_claude(
-                        model=model,
-                        messages=messages,
-                        system_prompt=system_prompt,
-                        max_tokens=max_tokens,
-                        temperature=temperature
-                    )
-                
-                elif model.startswith("gemini-"):
-                    if not self.has_vertex:
-                        raise Exception("Vertex AI not configured")
-                    return await self._call_vertex(
+                async with self._semaphore, self._rate_limiter:
+                    return await self._call_provider(
                         model=model,
                         messages=messages,
                         system_prompt=system_prompt,
                         max_tokens=max_tokens,
-                        temperature=temperature
+                        temperature=temperature,
+                        response_schema=response_schema
                     )
-                
-                else:
-                    raise Exception(f"Unknown model: {model}")
                     
-            except Exception as e:
-                error_msg = str(e)
-                
-                # Check if it's a rate limit error
-                if "429" in error_msg or "rate_limit" in error_msg.lower():
-                    if attempt < max_retries - 1:
-                        # Exponential backoff: 10s, 20s, 40s
-                        delay = base_delay * (2 ** attempt)
-                        self.logger.warning(
-                            f"⏱️  Rate limit hit. Retrying in {delay}s "
-                            f"(attempt {attempt + 1}/{max_retries})"
-                        )
-                        await asyncio.sleep(delay)
-                        continue
-                    else:
-                        self.logger.error("❌ Max retries exceeded for rate limit")
-                        raise
+            except QuotaExceededError as e:
+                # Rate limited - anything else propagates immediately
+                if attempt < max_retries - 1:
+                    # Exponential backoff (10s, 20s, 40s) with jitter, so callers
+                    # limited at the same moment don't all retry in lockstep;
+                    # never sooner than the provider's Retry-After
+                    backoff = base_delay * (2 ** attempt)
+                    delay = max(random.uniform(backoff / 2, backoff), e.retry_after)
+                    self.logger.warning(
+                        f"⏱️  Rate limit hit. Retrying in {delay:.1f}s "
+                        f"(attempt {attempt + 1}/{max_retries})"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
                 else:
-                    # Not a rate limit error, raise immediately
+                    self.logger.error("❌ Max retries exceeded for rate limit")
                     raise
     
+    async def _call_provider(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str],
+        max_tokens: Optional[int],
+        temperature: float,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> AIResponse:
+        """Determine if it's Claude or Vertex AI based on model name and call it"""
+        
+        provider = MODEL_PROVIDERS.get(model)
+        
+        if provider == "claude":
+            if not self.has_claude:
+                raise Exception("Claude API not configured")
+            call = self._call_claude
+        
+        elif provider == "vertex":
+            if not self.has_vertex:
+                raise Exception("Vertex AI not configured")
+            call = self._call_vertex
+        
+        else:
+            raise Exception(f"Unknown model: {model}")
+        
+        breaker = self._breakers[provider]
+        if not breaker.allow():
+            raise CircuitOpenError(f"{provider} circuit open, not calling {model}")
+        
+        try:
+            response = await call(
+                model=model,
+                messages=messages,
+                system_prompt=system_prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                response_schema=response_schema
+            )
+        except Exception as e:
+            if self._is_provider_failure(e):
+                breaker.record_failure()
+            raise
+        
+        breaker.record_success()
+        return response
+    
+    def _route_around_open_breaker(self, model: str) -> str:
+        """The model, or its first fallback if the model's provider breaker is open"""
+        if self._provider_available(model):
+            return model
+        
+        fallback = next(
+            (m for m in ESCALATION_CHAINS.get(model, []) if self._provider_available(m)),
+            None
+        )
+        if fallback is None:
+            return model
+        
+        self.logger.warning(f"⚡ {MODEL_PROVIDERS[model]} circuit open, using {fallback} instead of {model}")
+        return fallback
+    
+    def _provider_available(self, model: str) -> bool:
+        """False while the model's provider breaker is open (probes not claimed)"""
+        return self._breakers[MODEL_PROVIDERS[model]].state != "open"
+    
+    @staticmethod
+    def _is_provider_failure(error: Exception) -> bool:
+        """Network errors, 429s and 5xx count against a provider; bad requests don't"""
+        return isinstance(error, (httpx.TransportError, ProviderError))
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _claude_system(system_prompt: str) -> List[Dict[str, Any]]:
+        """
+        System prompt as a prompt-cache breakpoint.
+        
+        Tools and system prompt form the cached prefix, so repeated calls
+        with the same instructions pay ~10% for those input tokens.
+        Prefixes below the model's cache minimum are just not cached.
+        
+        Agents reuse a handful of fixed system prompts, so each block is
+        built once and shared (read-only - it is only serialized).
+        """
+        return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+    
+    @staticmethod
+    def _claude_input_tokens(usage: Dict[str, Any]) -> Tuple[int, float]:
+        """(total input tokens, billable input tokens) incl. prompt cache reads/writes"""
+        uncached = usage.get("input_tokens", 0)
+        written = usage.get("cache_creation_input_tokens", 0)
+        read = usage.get("cache_read_input_tokens", 0)
+        return uncached + written + read, uncached + 1.25 * written + 0.1 * read
+    
     async def _call_claude(
         self,
         model: str,
         messages: List[Dict[str, str]],
         system_prompt: Optional[str],
         max_tokens: Optional[int],
-        temperature: float
+        temperature: float,
+        response_schema: Optional[Dict[str, Any]] = None
     ) -> AIResponse:
         """Call Claude API (Anthropic) via REST"""
         
@@ -607,41 +1472,46 @@ class AIRouter:
         }
         
         if system_prompt:
-            request_body["system"] = system_prompt
+            request_body["system"] = self._claude_system(system_prompt)
+        
+        # Structured output: force a single tool call whose input is the result
+        if response_schema:
+            request_body["tools"] = [{
+                "name": "respond",
+                "description": "Return the structured result",
+                "input_schema": response_schema,
+            }]
+            request_body["tool_choice"] = {"type": "tool", "name": "respond"}
         
         # Call API
-        client = await self._get_client()
-        response = await client.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": self.anthropic_api_key,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json",
-            },
-            json=request_body
+        response = await self._post(
+            ANTHROPIC_URL,
+            headers=self._anthropic_headers,
+            content=json_body(request_body)
         )
         
         if response.status_code != 200:
-            raise Exception(f"Claude API error: {response.status_code} - {response.text}")
+            raise _api_error("Claude API", response)
         
         # Parse response
-        data = response.json()
+        data = json_loads(response.content)
         
-        # Extract content
-        content = ""
-        if data.get("content"):
-            for block in data["content"]:
-                if block.get("type") == "text":
-                    content += block.get("text", "")
+        # Extract content (structured output arrives as the "respond" tool input)
+        blocks = data.get("content") or []
+        tool_inputs = [block.get("input", {}) for block in blocks if block.get("type") == "tool_use"]
+        if tool_inputs:
+            content = json.dumps(tool_inputs[-1])
+        else:
+            content = "".join(block.get("text", "") for block in blocks if block.get("type") == "text")
         
         # Extract usage
         usage = data.get("usage", {})
-        input_tokens = usage.get("input_tokens", 0)
+        input_tokens, billable_input = self._claude_input_tokens(usage)
         output_tokens = usage.get("output_tokens", 0)
         
         # Calculate cost
         cost = (
-            (input_tokens / 1000) * model_config["cost_per_1k_input"] +
+            (billable_input / 1000) * model_config["cost_per_1k_input"] +
             (output_tokens / 1000) * model_config["cost_per_1k_output"]
         )
         
@@ -657,6 +1527,94 @@ class AIRouter:
             provider="claude"
         )
     
+    async def _stream_claude(
+        self,
+        stream: AIStream,
+        model: str,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str],
+        max_tokens: Optional[int],
+        temperature: float
+    ) -> AsyncIterator[str]:
+        """Stream Claude API (Anthropic) response via server-sent events"""
+        
+        model_config = CLAUDE_MODELS.get(model)
+        if not model_config:
+            raise Exception(f"Unknown Claude model: {model}")
+        
+        model_id = model_config["id"]
+        
+        request_body = {
+            "model": model_id,
+            "max_tokens": max_tokens or model_config["max_output_tokens"],
+            "temperature": temperature,
+            "messages": messages,
+            "stream": True,
+        }
+        
+        if system_prompt:
+            request_body["system"] = self._claude_system(system_prompt)
+        
+        parts = []
+        input_tokens = 0
+        billable_input = 0
+        output_tokens = 0
+        finish_reason = "stop"
+        
+        client = await self._get_client()
+        async with client.stream(
+            "POST",
+            ANTHROPIC_URL,
+            headers=self._anthropic_headers,
+            content=json_body(request_body)
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise _api_error("Claude API", response)
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                
+                event = json_loads(line[6:])
+                event_type = event.get("type")
+                
+                if event_type == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                    if text:
+                        parts.append(text)
+                        yield text
+                
+                elif event_type == "message_start":
+                    usage = event.get("message", {}).get("usage", {})
+                    input_tokens, billable_input = self._claude_input_tokens(usage)
+                
+                elif event_type == "message_delta":
+                    output_tokens = event.get("usage", {}).get("output_tokens", output_tokens)
+                    finish_reason = event.get("delta", {}).get("stop_reason") or finish_reason
+                
+                elif event_type == "error":
+                    error = event.get("error") or {}
+                    error_type = _CLAUDE_STREAM_ERRORS.get(error.get("type"), Exception)
+                    raise error_type(f"Claude API error: {error}")
+        
+        cost = (
+            (billable_input / 1000) * model_config["cost_per_1k_input"] +
+            (output_tokens / 1000) * model_config["cost_per_1k_output"]
+        )
+        
+        stream.response = AIResponse(
+            content="".join(parts),
+            model_id=model_id,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+            finish_reason=finish_reason,
+            latency_ms=0.0,  # Set by caller
+            cost_estimate=cost,
+            provider="claude"
+        )
+    
     def _convert_content_to_gemini(self, content):
         """Convert content (text or multimodal) to Gemini format"""
         
@@ -688,7 +1646,8 @@ class AIRouter:
         messages: List[Dict[str, str]],
         system_prompt: Optional[str],
         max_tokens: Optional[int],
-        temperature: float
+        temperature: float,
+        response_schema: Optional[Dict[str, Any]] = None
     ) -> AIResponse:
         """
         Call Vertex AI (Gemini) via REST API.
@@ -697,9 +1656,7 @@ class AIRouter:
         This is the method that works (based on your test script).
         """
         
-        # Refresh token if expired
-        if time.time() >= self.gcp_token_expiry:
-            self._refresh_gcp_token()
+        await self._ensure_gcp_token()
         
         # Get model config
         model_config = GEMINI_VERTEX_MODELS.get(model)
@@ -707,65 +1664,32 @@ class AIRouter:
             raise Exception(f"Unknown Vertex model: {model}")
         
         model_id = model_config["id"]
-        location = model_config["location"]
         
         # Use model's full capacity if max_tokens not specified
         if max_tokens is None:
             max_tokens = model_config["max_output_tokens"]
         
-        # Convert messages to Gemini format
-        contents = []
-        for msg in messages:
-            role = "user" if msg["role"] == "user" else "model"
-            
-            # Handle both string and multimodal content
-            parts = self._convert_content_to_gemini(msg["content"])
-            
-            contents.append({
-                "role": role,
-                "parts": parts
-            })
-        
-        # Build request body
-        request_body = {
-            "contents": contents,
-            "generationConfig": {
-                "maxOutputTokens": max_tokens,
-                "temperature": temperature,
-            }
-        }
-        
-        # Add system instruction if provided
-        if system_prompt:
-            request_body["systemInstruction"] = {
-                "parts": [{"text": system_prompt}]
-            }
+        # Build request (non-streaming endpoint, matches your working test script)
+        request_body = self._build_vertex_request(messages, system_prompt, max_tokens, temperature)
+        url = self._vertex_url(model, "generateContent")
         
-        # Build URL (non-streaming, matches your working test script)
-        url = (
-            f"https://aiplatform.googleapis.com/v1/"
-            f"projects/{self.gcp_project_id}/"
-            f"locations/{location}/"
-            f"publishers/google/"
-            f"models/{model_id}:generateContent"  # Non-streaming endpoint
-        )
+        # Structured output: JSON mode constrained to the schema
+        if response_schema:
+            request_body["generationConfig"]["responseMimeType"] = "application/json"
+            request_body["generationConfig"]["responseSchema"] = self._gemini_schema(response_schema)
         
         # Call API
-        client = await self._get_client()
-        response = await client.post(
+        response = await self._post(
             url,
-            headers={
-                "Authorization": f"Bearer {self.gcp_token}",
-                "Content-Type": "application/json"
-            },
-            json=request_body
+            headers=self._vertex_headers,
+            content=json_body(request_body)
         )
         
         if response.status_code != 200:
-            raise Exception(f"Vertex AI error: {response.status_code} - {response.text}")
+            raise _api_error("Vertex AI", response)
         
         # Parse complete JSON response (non-streaming)
-        data = response.json()
+        data = json_loads(response.content)
         
         full_text = ""
         finish_reason = "stop"
@@ -777,22 +1701,11 @@ class AIRouter:
             # Get text content
             if "content" in candidate:
                 parts = candidate["content"].get("parts", [])
-                for part in parts:
-                    if "text" in part:
-                        full_text += part["text"]
+                full_text = "".join(part["text"] for part in parts if "text" in part)
             
             # Get finish reason
             if "finishReason" in candidate:
-                reason = candidate["finishReason"]
-                # Map Gemini finish reasons to standard format
-                if reason == "MAX_TOKENS":
-                    finish_reason = "length"
-                elif reason in ["STOP", "FINISH_REASON_UNSPECIFIED"]:
-                    finish_reason = "stop"
-                elif reason in ["SAFETY", "RECITATION", "OTHER"]:
-                    finish_reason = "content_filter"
-                else:
-                    finish_reason = "stop"
+                finish_reason = self._map_gemini_finish_reason(candidate["finishReason"])
         
         # Extract token counts
         total_input_tokens = 0
@@ -819,6 +1732,180 @@ class AIRouter:
             cost_estimate=cost,
             provider="vertex_ai"
         )
+    
+    def _build_vertex_request(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float
+    ) -> Dict[str, Any]:
+        """Build Gemini request body from chat messages"""
+        
+        # Convert messages to Gemini format (string or multimodal content)
+        convert = self._convert_content_to_gemini
+        contents = [
+            {
+                "role": "user" if msg["role"] == "user" else "model",
+                "parts": convert(msg["content"])
+            }
+            for msg in messages
+        ]
+        
+        # Build request body
+        request_body = {
+            "contents": contents,
+            "generationConfig": {
+                "maxOutputTokens": max_tokens,
+                "temperature": temperature,
+            }
+        }
+        
+        # Add system instruction if provided
+        if system_prompt:
+            request_body["systemInstruction"] = {
+                "parts": [{"text": system_prompt}]
+            }
+        
+        return request_body
+    
+    def _vertex_url(self, model: str, method: str) -> str:
+        """Vertex AI REST URL for a model method (generateContent, ...), built once"""
+        url = self._vertex_urls.get((model, method))
+        if url is None:
+            model_config = GEMINI_VERTEX_MODELS[model]
+            url = self._vertex_urls[(model, method)] = (
+                f"https://aiplatform.googleapis.com/v1/"
+                f"projects/{self.gcp_project_id}/"
+                f"locations/{model_config['location']}/"
+                f"publishers/google/"
+                f"models/{model_config['id']}:{method}"
+            )
+        return url
+    
+    def _gemini_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Vertex form of a response schema, converted once per schema.
+        
+        Schemas are module-level constants, so they are keyed by identity
+        (the entry keeps the schema alive, so its id can't be reused).
+        Bounded at 32 entries, least recently used evicted first.
+        """
+        entry = self._gemini_schemas.get(id(schema))
+        if entry is not None and entry[0] is schema:
+            self._gemini_schemas.move_to_end(id(schema))
+            return entry[1]
+        
+        converted = self._to_gemini_schema(schema)
+        self._gemini_schemas[id(schema)] = (schema, converted)
+        if len(self._gemini_schemas) > 32:
+            self._gemini_schemas.popitem(last=False)
+        return converted
+    
+    @classmethod
+    def _to_gemini_schema(cls, schema: Any) -> Any:
+        """Convert JSON schema to Vertex's OpenAPI dialect (upper-case types)"""
+        if isinstance(schema, dict):
+            return {
+                key: value.upper() if key == "type" and isinstance(value, str)
+                else cls._to_gemini_schema(value)
+                for key, value in schema.items()
+            }
+        if isinstance(schema, list):
+            return [cls._to_gemini_schema(item) for item in schema]
+        return schema
+    
+    @staticmethod
+    def _map_gemini_finish_reason(reason: str) -> str:
+        """Map Gemini finish reasons to standard format"""
+        if reason == "MAX_TOKENS":
+            return "length"
+        elif reason in ["STOP", "FINISH_REASON_UNSPECIFIED"]:
+            return "stop"
+        elif reason in ["SAFETY", "RECITATION", "OTHER"]:
+            return "content_filter"
+        return "stop"
+    
+    async def _stream_vertex(
+        self,
+        stream: AIStream,
+        model: str,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str],
+        max_tokens: Optional[int],
+        temperature: float
+    ) -> AsyncIterator[str]:
+        """Stream Vertex AI (Gemini) response via server-sent events"""
+        
+        await self._ensure_gcp_token()
+        
+        model_config = GEMINI_VERTEX_MODELS.get(model)
+        if not model_config:
+            raise Exception(f"Unknown Vertex model: {model}")
+        
+        request_body = self._build_vertex_request(
+            messages,
+            system_prompt,
+            max_tokens or model_config["max_output_tokens"],
+            temperature
+        )
+        url = self._vertex_url(model, "streamGenerateContent?alt=sse")
+        
+        parts = []
+        input_tokens = 0
+        output_tokens = 0
+        finish_reason = "stop"
+        
+        client = await self._get_client()
+        async with client.stream(
+            "POST",
+            url,
+            headers=self._vertex_headers,
+            content=json_body(request_body)
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise _api_error("Vertex AI", response)
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                
+                data = json_loads(line[6:])
+                
+                if data.get("candidates"):
+                    candidate = data["candidates"][0]
+                    for part in candidate.get("content", {}).get("parts", []):
+                        text = part.get("text")
+                        if text:
+                            parts.append(text)
+                            yield text
+                    
+                    if "finishReason" in candidate:
+                        finish_reason = self._map_gemini_finish_reason(candidate["finishReason"])
+                
+                # Usage is cumulative - the last chunk has the totals
+                if "usageMetadata" in data:
+                    usage = data["usageMetadata"]
+                    input_tokens = usage.get("promptTokenCount", input_tokens)
+                    output_tokens = usage.get("candidatesTokenCount", output_tokens)
+        
+        cost = (
+            (input_tokens / 1000) * model_config["cost_per_1k_input"] +
+            (output_tokens / 1000) * model_config["cost_per_1k_output"]
+        )
+        
+        stream.response = AIResponse(
+            content="".join(parts),
+            model_id=model_config["id"],
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+            finish_reason=finish_reason,
+            latency_ms=0.0,  # Set by caller
+            cost_estimate=cost,
+            provider="vertex_ai"
+        )
 
 
 # =============================================================================
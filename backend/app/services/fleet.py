@@ -0,0 +1,160 @@
+# =============================================================================
+# FLEET DISPATCHER - Pools latency-tolerant AI calls into batches
+# Location: backend/app/services/fleet.py
+# Purpose: Half-price generations for work that can wait
+# =============================================================================
+#
+# Callers say how long they can wait (latency_budget_ms):
+# - Tight budgets (interactive chat) go straight to ai_router.generate()
+# - Interactive callers (someone is waiting on the result) also go straight
+#   through when nothing else is queued - a lone request would otherwise
+#   sit out the whole batch window
+# - Loose budgets (batched adversarial reviews, background checks) are queued, and the
+#   queue is sent as ONE Anthropic Message Batch (50% cheaper) once it
+#   reaches batch_min_size or batch_window_ms has passed
+#
+# Each caller awaits its own Future, so pooling is invisible to them.
+# If a batch can't be used (non-Claude model, batch error or timeout) the
+# queued requests fall back to normal parallel calls. A batch that times
+# out is cancelled.
+#
+# =============================================================================
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.services.ai_router import AIRouter, AIResponse, MODEL_PROVIDERS, TaskComplexity, ai_router
+
+logger = logging.getLogger("ai.fleet")
+
+
+@dataclass(frozen=True)
+class RoutingPolicy:
+    """When to call directly and when to pool into a batch"""
+    sync_max_latency_ms: int = 5_000    # Budgets up to this are called directly
+    batch_window_ms: int = 30_000       # Max time a request waits in the queue
+    batch_min_size: int = 5             # Queue size that triggers an early flush
+
+
+class FleetDispatcher:
+    """
+    Routes generations by latency budget.
+
+    Example:
+        response = await fleet.submit(
+            latency_budget_ms=600_000,
+            messages=[{"role": "user", "content": prompt}],
+            task_type="analysis"
+        )
+    """
+
+    def __init__(self, router: AIRouter, policy: RoutingPolicy = RoutingPolicy()):
+        self.router = router
+        self.policy = policy
+
+        # (request, future, deadline) - deadline is a time.monotonic() value
+        self._queue: List[Tuple[Dict[str, Any], asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.Handle] = None
+        self._batches: Set[asyncio.Task] = set()
+
+    async def submit(self, latency_budget_ms: int, interactive: bool = False, **request) -> AIResponse:
+        """
+        Generate a response within the given latency budget.
+
+        Args:
+            latency_budget_ms: How long the caller can wait for the result
+            interactive: A user is waiting - call directly unless other
+                requests are already queued to share a batch with
+            **request: Keyword arguments for ai_router.generate()
+
+        Returns:
+            AIResponse (from a batch or a direct call)
+        """
+
+        if (
+            latency_budget_ms <= self.policy.sync_max_latency_ms
+            or (interactive and not self._queue)
+            or not self._batchable(request)
+        ):
+            return await self.router.generate(**request)
+
+        future = asyncio.get_running_loop().create_future()
+        deadline = time.monotonic() + latency_budget_ms / 1000
+        self._queue.append((request, future, deadline))
+
+        if len(self._queue) >= self.policy.batch_min_size:
+            # Flush on the next loop turn, so requests submitted together
+            # (e.g. one asyncio.gather) all make it into the same batch
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = asyncio.get_running_loop().call_soon(self._flush)
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.policy.batch_window_ms / 1000, self._flush
+            )
+
+        return await future
+
+    def _batchable(self, request: Dict[str, Any]) -> bool:
+        """Only plain Claude generations can go through the Batches API"""
+        if not self.router.has_claude or request.get("response_schema"):
+            return False
+
+        model = request.get("model") or self.router.select_model(
+            request.get("task_type", "code_generation"),
+            request.get("complexity", TaskComplexity.MEDIUM)
+        )
+        return MODEL_PROVIDERS.get(model) == "claude"
+
+    def _flush(self):
+        """Send everything queued so far as one batch (in the background)"""
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        queued, self._queue = self._queue, []
+        if not queued:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run_batch(queued))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, queued: List[Tuple[Dict[str, Any], asyncio.Future, float]]):
+        """Run one batch and hand each caller its response"""
+
+        # The batch may run until the tightest caller's deadline
+        timeout = max(min(deadline for _, _, deadline in queued) - time.monotonic(), 1.0)
+        requests = [request for request, _, _ in queued]
+
+        try:
+            responses = await self.router.generate_batch(
+                requests,
+                poll_interval=min(30.0, timeout / 10),
+                timeout=timeout
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Fleet batch unavailable, running {len(queued)} requests directly: {e}")
+            responses = await asyncio.gather(
+                *(self.router.generate(**request) for request in requests),
+                return_exceptions=True
+            )
+
+        for (_, future, _), response in zip(queued, responses):
+            if future.done():
+                continue
+            if isinstance(response, BaseException):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+
+
+# =============================================================================
+# GLOBAL INSTANCE
+# =============================================================================
+
+fleet = FleetDispatcher(ai_router)
@@ -0,0 +1,114 @@
+# =============================================================================
+# LLM RESPONSE CACHE - Replays identical generations from disk
+# Location: backend/app/services/llm_cache.py
+# Purpose: Skip provider round-trips for repeatable prompts (test / CI runs)
+# =============================================================================
+#
+# Opt-in with NEXSIDI_LLM_CACHE=1. Each response is stored as one JSON file
+# under NEXSIDI_LLM_CACHE_DIR (default ~/.nexsidi/cache/), named by the
+# sha256 of everything that shapes the output: model, messages, system
+# prompt, max_tokens, temperature and response schema.
+#
+# Unlike the router's in-memory dedup cache this survives restarts, so a
+# second run of the test suite returns instantly for every fixed prompt.
+#
+# =============================================================================
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("ai.cache")
+
+
+class LLMCache:
+    """
+    Disk-backed cache of AIResponse dicts.
+
+    Example:
+        key = llm_cache.key(model=model, messages=messages, max_tokens=None)
+        cached = await llm_cache.get(key)
+        ...
+        await llm_cache.set(key, response, ttl=3600)
+    """
+
+    def __init__(self, directory: Path, enabled: bool = True):
+        self.directory = directory
+        self.enabled = enabled
+
+    @classmethod
+    def from_env(cls) -> "LLMCache":
+        """Build the cache from NEXSIDI_LLM_CACHE / NEXSIDI_LLM_CACHE_DIR"""
+        directory = os.getenv("NEXSIDI_LLM_CACHE_DIR") or Path.home() / ".nexsidi" / "cache"
+        return cls(Path(directory), enabled=os.getenv("NEXSIDI_LLM_CACHE") == "1")
+
+    @staticmethod
+    def key(
+        model: str,
+        messages: List[Dict[str, Any]],
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Hash every input that changes the generated output"""
+        content = json.dumps({
+            "model": model,
+            "messages": messages,
+            "system_prompt": system_prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "response_schema": response_schema
+        }, sort_keys=True, default=str)
+
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response dict, or None on a miss / expired entry"""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, response: Any, ttl: float = 3600):
+        """Store an AIResponse (or its dict form) for ttl seconds"""
+        if not self.enabled:
+            return
+        value = response if isinstance(response, dict) else asdict(response)
+        await asyncio.to_thread(self._write, key, value, time.time() + ttl)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("expires_at", 0) < time.time():
+            return None
+        return entry.get("response")
+
+    def _write(self, key: str, value: Dict[str, Any], expires_at: float):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write then rename so a concurrent reader never sees half a file
+            tmp = self._path(key).with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps({"expires_at": expires_at, "response": value}), encoding="utf-8")
+            tmp.replace(self._path(key))
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write LLM cache entry: {e}")
+
+
+# =============================================================================
+# GLOBAL INSTANCE
+# =============================================================================
+
+llm_cache = LLMCache.from_env()
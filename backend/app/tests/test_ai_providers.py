@@ -161,11 +161,20 @@ async def main():
     print("  AI PROVIDER CONNECTION TESTS")
     print("="*70)
     
-    results = {
-        "Vertex AI (GCP)": await test_vertex_ai(),
-        "Claude AI (Anthropic)": await test_claude_ai(),
-        "Gemini AI Studio": await test_gemini_ai_studio()
-    }
+    # One provider at a time, so each probe's step-by-step output stays
+    # readable; a probe that raises counts as a failure
+    providers = [
+        ("Vertex AI (GCP)", test_vertex_ai),
+        ("Claude AI (Anthropic)", test_claude_ai),
+        ("Gemini AI Studio", test_gemini_ai_studio),
+    ]
+    results = {}
+    for provider, test in providers:
+        try:
+            results[provider] = await test() is True
+        except Exception as e:
+            print(f"\n❌ {provider} test crashed: {e}")
+            results[provider] = False
     
     # Summary
     print("\n" + "="*70)
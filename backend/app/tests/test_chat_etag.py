@@ -0,0 +1,62 @@
+"""
+Test the chat history ETag
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app.api.chat import _history_etag
+
+LIMIT = 5
+
+
+def _page(history):
+    """Newest LIMIT messages, oldest first - same window as GET /history"""
+    return sorted(history, key=lambda m: m.created_at)[-LIMIT:]
+
+
+def test_etag_changes_after_middle_delete():
+    print("\n" + "="*70)
+    print("  CHAT HISTORY ETAG - DELETE A MIDDLE MESSAGE")
+    print("="*70)
+
+    start = datetime(2025, 12, 31, 10, 30)
+    history = [
+        SimpleNamespace(id=uuid.uuid4(), created_at=start + timedelta(seconds=i))
+        for i in range(LIMIT + 1)
+    ]
+
+    before = _history_etag(_page(history), "planning")
+
+    # Same page size and same newest message afterwards - an older one slides in
+    del history[3]
+    after = _history_etag(_page(history), "planning")
+
+    print(f"   Before: {before}")
+    print(f"   After:  {after}")
+    assert before != after, "ETag must change when a middle message is deleted"
+
+
+def test_etag_stable_and_tracks_status():
+    print("\n" + "="*70)
+    print("  CHAT HISTORY ETAG - STABLE / STATUS")
+    print("="*70)
+
+    messages = [SimpleNamespace(id=uuid.uuid4()) for _ in range(3)]
+
+    assert _history_etag(messages, None) == _history_etag(list(messages), None)
+    assert _history_etag(messages, None) != _history_etag(messages, "planning")
+    print("   ✅ Same messages give the same tag; status change gives a new one")
+
+
+if __name__ == "__main__":
+    test_etag_changes_after_middle_delete()
+    test_etag_stable_and_tracks_status()
+    print("\n✅ All chat ETag tests passed")
+    print("="*70)
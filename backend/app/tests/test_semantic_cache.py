@@ -0,0 +1,79 @@
+"""
+Test the AI router's semantic (near-duplicate) prompt cache
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from app.services.ai_router import AIResponse, SemanticCache
+
+SCOPE = "simple:claude-haiku-4-5:50:test"
+
+# Long enough that a single changed word still scores above the 0.97 threshold
+BAKERY = (
+    "I run a small family bakery in Pune and want an online store where customers "
+    "can browse cakes, pastries and breads, place orders for pickup or home delivery, "
+    "pay online with UPI or cards, track their order status, leave reviews and get "
+    "a loyalty discount on repeat purchases. "
+)
+
+
+def _response(content: str) -> AIResponse:
+    return AIResponse(
+        content=content,
+        model_id="claude-haiku-4-5",
+        input_tokens=20,
+        output_tokens=10,
+        total_tokens=30,
+        finish_reason="stop",
+        latency_ms=1.0,
+        cost_estimate=0.0,
+        provider="claude"
+    )
+
+
+def test_rephrasing_hits():
+    print("\n" + "="*70)
+    print("  SEMANTIC CACHE - REPHRASING HITS")
+    print("="*70)
+
+    cache = SemanticCache()
+    cache.put(SCOPE, BAKERY + "Please keep it simple.", _response("cached"))
+
+    hit = cache.get(SCOPE, BAKERY.upper() + "Please, keep it simple!")
+    print(f"   Rephrased prompt: {'HIT' if hit else 'MISS'}")
+    assert hit is not None and hit.content == "cached"
+
+
+def test_number_change_misses():
+    print("\n" + "="*70)
+    print("  SEMANTIC CACHE - DIFFERENT NUMBERS MISS")
+    print("="*70)
+
+    cache = SemanticCache()
+    cache.put(SCOPE, BAKERY + "My budget 50000 rupees.", _response("50k"))
+
+    hit = cache.get(SCOPE, BAKERY + "My budget 90000 rupees.")
+    print(f"   budget 50000 -> budget 90000: {'HIT' if hit else 'MISS'}")
+    assert hit is None, "Prompts differing only in a number must not share a reply"
+
+
+def test_negation_misses():
+    print("\n" + "="*70)
+    print("  SEMANTIC CACHE - NEGATION MISSES")
+    print("="*70)
+
+    cache = SemanticCache()
+    cache.put(SCOPE, BAKERY + "Include an admin panel.", _response("admin"))
+
+    hit = cache.get(SCOPE, BAKERY + "Include no admin panel.")
+    print(f"   an admin panel -> no admin panel: {'HIT' if hit else 'MISS'}")
+    assert hit is None, "Prompts differing only in a negation must not share a reply"
+
+
+if __name__ == "__main__":
+    test_rephrasing_hits()
+    test_number_change_misses()
+    test_negation_misses()
+    print("\n✅ All semantic cache tests passed")
+    print("="*70)
@@ -20,6 +20,10 @@ from shubham_v2_production import (
 )
 
 
+# Section divider used by every test header and the summary
+DIVIDER = "=" * 80
+
+
 # =============================================================================
 # TEST DATA
 # =============================================================================
@@ -76,9 +80,9 @@ SAMPLE_ARCHITECTURE = {
 
 async def test_1_single_file_generation():
     """Test 1: Generate a single simple file"""
-    print("\n" + "="*80)
+    print("\n" + DIVIDER)
     print("TEST 1: Single File Generation (database.py)")
-    print("="*80)
+    print(DIVIDER)
     
     try:
         shubham = Shubham(
@@ -117,9 +121,9 @@ async def test_1_single_file_generation():
 
 async def test_2_models_generation():
     """Test 2: Generate models.py (more complex)"""
-    print("\n" + "="*80)
+    print("\n" + DIVIDER)
     print("TEST 2: Models Generation (complex file)")
-    print("="*80)
+    print(DIVIDER)
     
     try:
         shubham = Shubham(
@@ -166,9 +170,9 @@ async def test_2_models_generation():
 
 async def test_3_multiple_files():
     """Test 3: Generate multiple files in order"""
-    print("\n" + "="*80)
+    print("\n" + DIVIDER)
     print("TEST 3: Multiple Files Generation")
-    print("="*80)
+    print(DIVIDER)
     
     try:
         shubham = Shubham(
@@ -224,9 +228,9 @@ async def test_3_multiple_files():
 
 async def test_4_null_byte_cleaning():
     """Test 4: Verify NULL byte cleaning works"""
-    print("\n" + "="*80)
+    print("\n" + DIVIDER)
     print("TEST 4: NULL Byte Cleaning")
-    print("="*80)
+    print(DIVIDER)
     
     try:
         shubham = Shubham(
@@ -260,9 +264,9 @@ async def test_4_null_byte_cleaning():
 
 async def test_5_syntax_validation():
     """Test 5: Verify syntax validation works"""
-    print("\n" + "="*80)
+    print("\n" + DIVIDER)
     print("TEST 5: Syntax Validation")
-    print("="*80)
+    print(DIVIDER)
     
     try:
         shubham = Shubham(
@@ -310,9 +314,9 @@ async def root()
 
 async def test_6_tilotma_validation():
     """Test 6: Test Tilotma validation layer"""
-    print("\n" + "="*80)
+    print("\n" + DIVIDER)
     print("TEST 6: Tilotma Validation")
-    print("="*80)
+    print(DIVIDER)
     
     try:
         from shubham_v2_production import GeneratedFile
@@ -379,9 +383,9 @@ async def get_users(db: Session = Depends(get_db)):
 
 async def test_7_token_limits():
     """Test 7: Verify token limits are applied correctly"""
-    print("\n" + "="*80)
+    print("\n" + DIVIDER)
     print("TEST 7: Token Limit Strategy")
-    print("="*80)
+    print(DIVIDER)
     
     try:
         from shubham_v2_production import TOKEN_LIMITS, FILE_COMPLEXITY
@@ -409,47 +413,59 @@ async def test_7_token_limits():
 # MAIN TEST RUNNER
 # =============================================================================
 
+BANNER = "\n".join([
+    "\n",
+    "╔" + "═" * 78 + "╗",
+    "║" + " " * 20 + "SHUBHAM V2 TEST SUITE" + " " * 37 + "║",
+    "║" + " " * 78 + "║",
+    "║  Testing production-ready code generation agent" + " " * 29 + "║",
+    "╚" + "═" * 78 + "╝",
+])
+
+
 async def main():
     """Run all tests"""
     
-    print("\n")
-    print("╔" + "═" * 78 + "╗")
-    print("║" + " " * 20 + "SHUBHAM V2 TEST SUITE" + " " * 37 + "║")
-    print("║" + " " * 78 + "║")
-    print("║  Testing production-ready code generation agent" + " " * 29 + "║")
-    print("╚" + "═" * 78 + "╝")
+    print(BANNER)
     
-    results = []
-    
-    # Run tests
-    results.append(("Single File Generation", await test_1_single_file_generation()))
-    results.append(("Models Generation", await test_2_models_generation()))
-    results.append(("Multiple Files", await test_3_multiple_files()))
-    results.append(("NULL Byte Cleaning", await test_4_null_byte_cleaning()))
-    results.append(("Syntax Validation", await test_5_syntax_validation()))
-    results.append(("Tilotma Validation", await test_6_tilotma_validation()))
-    results.append(("Token Limits", await test_7_token_limits()))
+    tests = [
+        ("Single File Generation", test_1_single_file_generation),
+        ("Models Generation", test_2_models_generation),
+        ("Multiple Files", test_3_multiple_files),
+        ("NULL Byte Cleaning", test_4_null_byte_cleaning),
+        ("Syntax Validation", test_5_syntax_validation),
+        ("Tilotma Validation", test_6_tilotma_validation),
+        ("Token Limits", test_7_token_limits),
+    ]
     
-    # Summary
-    print("\n" + "="*80)
-    print("TEST SUMMARY")
-    print("="*80)
+    # Run tests one after another, so each test's step-by-step output
+    # stays together; a test that raises counts as a failure
+    results = []
+    for name, test in tests:
+        try:
+            results.append((name, await test() is True))
+        except Exception as e:
+            print(f"\n❌ {name} crashed: {e}")
+            results.append((name, False))
     
+    # Summary (built up and written once)
     passed = sum(1 for _, result in results if result)
     total = len(results)
     
-    for test_name, result in results:
-        status = "✅ PASS" if result else "❌ FAIL"
-        print(f"{status} - {test_name}")
-    
-    print(f"\nTotal: {passed}/{total} tests passed ({(passed/total*100):.1f}%)")
+    summary = ["\n" + DIVIDER, "TEST SUMMARY", DIVIDER]
+    summary.extend(
+        f"{'✅ PASS' if result else '❌ FAIL'} - {test_name}"
+        for test_name, result in results
+    )
+    summary.append(f"\nTotal: {passed}/{total} tests passed ({(passed/total*100):.1f}%)")
     
     if passed == total:
-        print("\n🎉 ALL TESTS PASSED! Shubham V2 is ready for integration.")
+        summary.append("\n🎉 ALL TESTS PASSED! Shubham V2 is ready for integration.")
     else:
-        print(f"\n⚠️ {total - passed} test(s) failed. Review errors above.")
+        summary.append(f"\n⚠️ {total - passed} test(s) failed. Review errors above.")
     
-    print("\n" + "="*80)
+    summary.append("\n" + DIVIDER)
+    print("\n".join(summary))
 
 
 if __name__ == "__main__":
@@ -39,6 +39,17 @@ GEMINI_MODELS_VERTEX = {
     "gemini-2.5-flash-lite": "gemini-2.5-flash-lite",
 }
 
+# =============================================================================
+# SHARED HTTP CLIENT
+# =============================================================================
+
+# One keep-alive client for the whole run, so every model test after the
+# first reuses the provider connection instead of paying a new TLS handshake
+http_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(30.0, connect=10.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+)
+
 # =============================================================================
 # TEST RESULTS STORAGE
 # =============================================================================
@@ -129,42 +140,41 @@ async def test_claude_model(model_name: str, model_id: str) -> Dict:
         }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json",
-                },
-                json={
-                    "model": model_id,
-                    "max_tokens": 100,
-                    "messages": [
-                        {"role": "user", "content": "Say 'Hello from Claude!' in exactly 3 words."}
-                    ]
-                }
-            )
+        response = await http_client.post(
+            "https://api.anthropic.com/v1/messages",
+            headers={
+                "x-api-key": api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json",
+            },
+            json={
+                "model": model_id,
+                "max_tokens": 100,
+                "messages": [
+                    {"role": "user", "content": "Say 'Hello from Claude!' in exactly 3 words."}
+                ]
+            }
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            content = data.get("content", [{}])[0].get("text", "")
+            usage = data.get("usage", {})
+            
+            return {
+                "status": "SUCCESS",
+                "model": model_id,
+                "response": content[:50],
+                "input_tokens": usage.get("input_tokens", 0),
+                "output_tokens": usage.get("output_tokens", 0)
+            }
+        else:
+            return {
+                "status": "FAIL",
+                "error": f"HTTP {response.status_code}: {response.text[:200]}",
+                "model": model_id
+            }
             
-            if response.status_code == 200:
-                data = response.json()
-                content = data.get("content", [{}])[0].get("text", "")
-                usage = data.get("usage", {})
-                
-                return {
-                    "status": "SUCCESS",
-                    "model": model_id,
-                    "response": content[:50],
-                    "input_tokens": usage.get("input_tokens", 0),
-                    "output_tokens": usage.get("output_tokens", 0)
-                }
-            else:
-                return {
-                    "status": "FAIL",
-                    "error": f"HTTP {response.status_code}: {response.text[:200]}",
-                    "model": model_id
-                }
-                
     except Exception as e:
         return {
             "status": "FAIL",
@@ -204,46 +214,45 @@ async def test_gemini_ai_studio_model(model_name: str, model_id: str) -> Dict:
         }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_id}:generateContent?key={api_key}"
-            
-            response = await client.post(
-                url,
-                json={
-                    "contents": [{
-                        "role": "user",
-                        "parts": [{"text": "Say 'Hello from Gemini!' in exactly 3 words."}]
-                    }],
-                    "generationConfig": {
-                        "maxOutputTokens": 100,
-                        "temperature": 0.7
-                    }
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_id}:generateContent?key={api_key}"
+        
+        response = await http_client.post(
+            url,
+            json={
+                "contents": [{
+                    "role": "user",
+                    "parts": [{"text": "Say 'Hello from Gemini!' in exactly 3 words."}]
+                }],
+                "generationConfig": {
+                    "maxOutputTokens": 100,
+                    "temperature": 0.7
                 }
-            )
+            }
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            content = ""
+            if data.get("candidates"):
+                parts = data["candidates"][0].get("content", {}).get("parts", [])
+                content = parts[0].get("text", "") if parts else ""
+            
+            usage = data.get("usageMetadata", {})
+            
+            return {
+                "status": "SUCCESS",
+                "model": model_id,
+                "response": content[:50],
+                "input_tokens": usage.get("promptTokenCount", 0),
+                "output_tokens": usage.get("candidatesTokenCount", 0)
+            }
+        else:
+            return {
+                "status": "FAIL",
+                "error": f"HTTP {response.status_code}: {response.text[:200]}",
+                "model": model_id
+            }
             
-            if response.status_code == 200:
-                data = response.json()
-                content = ""
-                if data.get("candidates"):
-                    parts = data["candidates"][0].get("content", {}).get("parts", [])
-                    content = parts[0].get("text", "") if parts else ""
-                
-                usage = data.get("usageMetadata", {})
-                
-                return {
-                    "status": "SUCCESS",
-                    "model": model_id,
-                    "response": content[:50],
-                    "input_tokens": usage.get("promptTokenCount", 0),
-                    "output_tokens": usage.get("candidatesTokenCount", 0)
-                }
-            else:
-                return {
-                    "status": "FAIL",
-                    "error": f"HTTP {response.status_code}: {response.text[:200]}",
-                    "model": model_id
-                }
-                
     except Exception as e:
         return {
             "status": "FAIL",
@@ -376,9 +385,12 @@ async def main():
     print("╚" + "═" * 78 + "╝")
     
     # Test each provider
-    await test_all_claude()
-    await test_all_gemini_ai_studio()
-    await test_all_vertex_ai()
+    try:
+        await test_all_claude()
+        await test_all_gemini_ai_studio()
+        await test_all_vertex_ai()
+    finally:
+        await http_client.aclose()
     
     # Print summary
     print_summary()